@@ -0,0 +1,205 @@
+# eightPuzzleBatch.py
+# -------------------
+# Solves a batch of eight puzzles over a pool of processes and reports the
+# throughput of a search algorithm.
+#
+# Examples:
+#   python eightPuzzleBatch.py                              (200 random puzzles with A* and the pattern databases)
+#   python eightPuzzleBatch.py -n 1000 -f idastar -e perfectHeuristic -j 4
+#   python eightPuzzleBatch.py -f bibfs --scramble 40       (scrambled rather than random puzzles)
+#   python eightPuzzleBatch.py -i puzzles.txt               (one puzzle per line, tiles row by row)
+#
+# Random puzzles are permutations of the tiles drawn with a fixed seed, so
+# half of them cannot be solved; those are skipped with a parity check
+# before any search runs.  Loaded puzzles are checked the same way.
+
+
+import multiprocessing
+import optparse
+import random
+import sys
+import time
+
+import eightpuzzle
+import search
+
+def generatePuzzles(count, seed, size=3, scramble=None):
+    """
+    Returns count puzzles as lists of tiles, row by row.  Without scramble
+    they are random permutations; otherwise each one is the goal after
+    scramble random moves.  The same seed always gives the same puzzles.
+    """
+    random.seed(seed)
+    puzzles = []
+    for i in range(count):
+        if scramble == None:
+            numbers = range(size * size)
+            random.shuffle(numbers)
+        else:
+            numbers = eightpuzzle.createRandomEightPuzzle(scramble, size).getNumbers()
+        puzzles.append(numbers)
+    return puzzles
+
+def readPuzzles(fileName):
+    "Reads one puzzle per line, with the tiles separated by spaces or commas."
+    puzzles = []
+    f = open(fileName)
+    try:
+        for line in f:
+            line = line.split('#')[0].replace(',', ' ').strip()
+            if line:
+                puzzles.append([int(tile) for tile in line.split()])
+    finally:
+        f.close()
+    return puzzles
+
+def getSearchFunction(fnName, heuristicName):
+    """
+    Looks up the search function in search.py and, if it takes one, the
+    heuristic in eightpuzzle.py or search.py, as SearchAgent does.
+    """
+    if fnName not in dir(search):
+        raise AttributeError, fnName + ' is not a search function in search.py.'
+    func = getattr(search, fnName)
+    if 'heuristic' not in func.func_code.co_varnames:
+        return func, None
+    if heuristicName in dir(eightpuzzle):
+        heuristic = getattr(eightpuzzle, heuristicName)
+    elif heuristicName in dir(search):
+        heuristic = getattr(search, heuristicName)
+    else:
+        raise AttributeError, heuristicName + ' is not a function in eightpuzzle.py or search.py.'
+    return func, heuristic
+
+def solvePuzzle(task):
+    """
+    Solves one puzzle in a worker.  task is (numbers, fnName, heuristicName);
+    only names and lists cross the process boundary.  Returns (numbers,
+    moves, expanded, seconds), where moves is None if the actions found do
+    not lead to the goal.
+    """
+    numbers, fnName, heuristicName = task
+    func, heuristic = getSearchFunction(fnName, heuristicName)
+    puzzle = eightpuzzle.CompactEightPuzzleState(numbers)
+    problem = eightpuzzle.CountingEightPuzzleSearchProblem(puzzle)
+    start = time.time()
+    if heuristic == None:
+        actions = func(problem)
+    else:
+        actions = func(problem, heuristic)
+    seconds = time.time() - start
+    state = puzzle
+    for action in actions:
+        state = state.result(action)
+    moves = None
+    if state.isGoal():
+        moves = len(actions)
+    return numbers, moves, problem._expanded, seconds
+
+def warmUp(fnName, heuristicName, size):
+    """
+    Evaluates the heuristic once before the pool starts, so tables cached
+    on disk are built by one process instead of by every worker.
+    """
+    func, heuristic = getSearchFunction(fnName, heuristicName)
+    if heuristic != None:
+        goal = eightpuzzle.CompactEightPuzzleState(range(size * size))
+        heuristic(goal, eightpuzzle.CountingEightPuzzleSearchProblem(goal))
+
+def percentile(values, fraction):
+    "The nearest-rank percentile of a list of numbers sorted in increasing order."
+    if not values:
+        return 0.0
+    rank = int(round(fraction * len(values) + 0.5)) - 1
+    return values[max(0, min(len(values) - 1, rank))]
+
+def solveBatch(puzzles, fnName, heuristicName, processes, chunkSize=1):
+    """
+    Solves every solvable puzzle and returns (results, skipped, seconds),
+    where results are the tuples of solvePuzzle in the order of the puzzles
+    and skipped lists the unsolvable puzzles.
+    """
+    solvable = [numbers for numbers in puzzles if eightpuzzle.isSolvable(numbers)]
+    skipped = [numbers for numbers in puzzles if not eightpuzzle.isSolvable(numbers)]
+    tasks = [(numbers, fnName, heuristicName) for numbers in solvable]
+    start = time.time()
+    if processes == 1:
+        results = map(solvePuzzle, tasks)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(solvePuzzle, tasks, chunkSize)
+        finally:
+            pool.terminate()
+            pool.join()
+    return results, skipped, time.time() - start
+
+def printReport(results, skipped, seconds, processes):
+    latencies = sorted([result[3] for result in results])
+    failed = [result for result in results if result[1] == None]
+    print('Puzzles:        %d solved, %d skipped as unsolvable, %d wrong' %
+          (len(results) - len(failed), len(skipped), len(failed)))
+    print('Processes:      %d' % processes)
+    print('Wall time:      %.3f s' % seconds)
+    if not results:
+        return
+    print('Throughput:     %.1f puzzles/s' % (len(results) / max(seconds, 1e-9)))
+    print('Mean expanded:  %.1f' % (sum([result[2] for result in results]) / float(len(results))))
+    solved = [result[1] for result in results if result[1] != None]
+    if solved:
+        print('Mean moves:     %.2f' % (sum(solved) / float(len(solved))))
+    print('Latency:        p50 %.4f s, p95 %.4f s, p99 %.4f s, max %.4f s' %
+          (percentile(latencies, 0.50), percentile(latencies, 0.95),
+           percentile(latencies, 0.99), latencies[-1]))
+    for numbers, moves, expanded, elapsed in failed:
+        print('Wrong solution for %s' % numbers)
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description = 'Solve a batch of eight puzzles over a pool of processes')
+    parser.add_option('-n', '--count', dest = 'count', type = 'int', default = 200,
+                      help = 'the number of puzzles to generate [Default: %default]')
+    parser.add_option('--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'the random seed of the generated puzzles [Default: %default]')
+    parser.add_option('--scramble', dest = 'scramble', type = 'int', default = None,
+                      help = 'scramble the goal with this many random moves instead of drawing random permutations')
+    parser.add_option('--size', dest = 'size', type = 'int', default = 3,
+                      help = 'the number of rows of generated puzzles; 4 makes 15-puzzles [Default: %default]')
+    parser.add_option('-i', '--input', dest = 'input', default = None,
+                      help = 'read the puzzles from a file, one per line, instead of generating them')
+    parser.add_option('-d', '--data', dest = 'data', action = 'store_true', default = False,
+                      help = 'solve the puzzles of eightpuzzle.EIGHT_PUZZLE_DATA instead of generating them')
+    parser.add_option('-f', '--fn', dest = 'fn', default = 'astar',
+                      help = 'the search function in search.py [Default: %default]')
+    parser.add_option('-e', '--heuristic', dest = 'heuristic', default = 'additivePDBHeuristic',
+                      help = 'the heuristic, for search functions which take one [Default: %default]')
+    parser.add_option('-j', '--processes', dest = 'processes', type = 'int', default = multiprocessing.cpu_count(),
+                      help = 'the number of worker processes [Default: %default]')
+    parser.add_option('-c', '--chunkSize', dest = 'chunkSize', type = 'int', default = 1,
+                      help = 'the number of puzzles sent to a worker at a time [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+def runBatch(options):
+    if options.input != None:
+        puzzles = readPuzzles(options.input)
+    elif options.data:
+        puzzles = [list(numbers) for numbers in eightpuzzle.EIGHT_PUZZLE_DATA]
+    else:
+        puzzles = generatePuzzles(options.count, options.seed, options.size, options.scramble)
+    for numbers in puzzles:
+        if sorted(numbers) != range(len(puzzles[0])):
+            raise Exception('Not a puzzle of the same size as the first: ' + str(numbers))
+    if puzzles:
+        warmUp(options.fn, options.heuristic, int(round(len(puzzles[0]) ** 0.5)))
+    processes = max(1, options.processes)
+    results, skipped, seconds = solveBatch(puzzles, options.fn, options.heuristic, processes, options.chunkSize)
+    printReport(results, skipped, seconds, processes)
+    if [result for result in results if result[1] == None]:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    sys.exit(runBatch(options))
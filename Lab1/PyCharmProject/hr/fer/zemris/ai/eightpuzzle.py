@@ -12,11 +12,16 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
+import array
+import os
 import search
 import random
+import patternDatabases
 
 # Module Classes
 
+OPPOSITE_MOVES = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+
 class EightPuzzleState:
     """
     The Eight Puzzle is described in the course textbook on
@@ -48,13 +53,17 @@ class EightPuzzleState:
 
         The configuration of the puzzle is stored in a 2-dimensional
         list (a list of lists) 'cells'.
+
+        Larger sliding puzzles are built the same way: 16 numbers from 0 to
+        15 make a 15-puzzle with 'size' 4.
         """
+        self.size = int(round(len(numbers) ** 0.5))
         self.cells = []
         numbers = numbers[:] # Make a copy so as not to cause side-effects.
         numbers.reverse()
-        for row in range( 3 ):
+        for row in range( self.size ):
             self.cells.append( [] )
-            for col in range( 3 ):
+            for col in range( self.size ):
                 self.cells[row].append( numbers.pop() )
                 if self.cells[row][col] == 0:
                     self.blankLocation = row, col
@@ -78,8 +87,8 @@ class EightPuzzleState:
         False
         """
         current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
+        for row in range( self.size ):
+            for col in range( self.size ):
                 if current != self.cells[row][col]:
                     return False
                 current += 1
@@ -99,11 +108,11 @@ class EightPuzzleState:
         row, col = self.blankLocation
         if(row != 0):
             moves.append('up')
-        if(row != 2):
+        if(row != self.size - 1):
             moves.append('down')
         if(col != 0):
             moves.append('left')
-        if(col != 2):
+        if(col != self.size - 1):
             moves.append('right')
         return moves
 
@@ -136,7 +145,7 @@ class EightPuzzleState:
             raise "Illegal Move"
 
         # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
+        newPuzzle = EightPuzzleState([0] * (self.size * self.size))
         newPuzzle.cells = [values[:] for values in self.cells]
         # And update it to reflect the move
         newPuzzle.cells[row][col] = self.cells[newrow][newcol]
@@ -145,6 +154,21 @@ class EightPuzzleState:
 
         return newPuzzle
 
+    def getSuccessors(self):
+        "Returns (successor, move) for every legal move, in the order of legalMoves."
+        return [(self.result(move), move) for move in self.legalMoves()]
+
+    def getNumbers(self):
+        "Returns the tiles row by row, as passed to the constructor."
+        return [tile for row in self.cells for tile in row]
+
+    def getTileCells(self):
+        "Returns a list holding the cell (numbered row by row) of every tile."
+        tileCells = [0] * (self.size * self.size)
+        for cell, tile in enumerate(self.getNumbers()):
+            tileCells[tile] = cell
+        return tileCells
+
     # Utilities for comparison and display
     def __eq__(self, other):
         """
@@ -155,7 +179,7 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
+        for row in range( self.size ):
             if self.cells[row] != other.cells[row]:
                 return False
         return True
@@ -168,14 +192,15 @@ class EightPuzzleState:
           Returns a display string for the maze
         """
         lines = []
-        horizontalLine = ('-' * (13))
+        width = len(str(self.size * self.size - 1))
+        horizontalLine = ('-' * ((width + 3) * self.size + 1))
         lines.append(horizontalLine)
         for row in self.cells:
             rowLine = '|'
             for col in row:
                 if col == 0:
                     col = ' '
-                rowLine = rowLine + ' ' + col.__str__() + ' |'
+                rowLine = rowLine + ' ' + col.__str__().rjust(width) + ' |'
             lines.append(rowLine)
             lines.append(horizontalLine)
         return '\n'.join(lines)
@@ -183,6 +208,131 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
+class CompactEightPuzzleState(object):
+    """
+      The same puzzle as EightPuzzleState, packed into a single integer
+      'tiles' holding the tile of cell i (cells numbered row by row) in bits
+      4i to 4i+3, together with the cell of the blank.  A move XORs the
+      moved tile out of one cell and into the other, so states are cheap to
+      create, hash and compare, and take little memory.  Boards of up to
+      16 cells (the 15-puzzle) are supported.
+
+      It offers the methods of EightPuzzleState, so either can be passed to
+      EightPuzzleSearchProblem; cells and blankLocation are computed when
+      read.
+
+      >>> CompactEightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left').isGoal()
+      True
+    """
+    __slots__ = ('tiles', 'blank', 'size')
+
+    def __init__(self, numbers, blank=None, size=None):
+        """
+          numbers: a list of the tiles row by row, as for EightPuzzleState,
+            or an already packed integer, in which case blank and size must
+            be given as well
+        """
+        if isinstance(numbers, (int, long)):
+            self.tiles, self.blank, self.size = numbers, blank, size
+            return
+        self.size = int(round(len(numbers) ** 0.5))
+        self.tiles = 0
+        for cell, tile in enumerate(numbers):
+            self.tiles |= tile << (4 * cell)
+            if tile == 0:
+                self.blank = cell
+
+    def fromPuzzle(puzzle):
+        "Packs an EightPuzzleState."
+        return CompactEightPuzzleState(puzzle.getNumbers())
+    fromPuzzle = staticmethod(fromPuzzle)
+
+    def getNumbers(self):
+        "Returns the tiles row by row."
+        tiles = self.tiles
+        return [(tiles >> (4 * cell)) & 15 for cell in range(self.size * self.size)]
+
+    def getTileCells(self):
+        "Returns a list holding the cell of every tile."
+        tileCells = [0] * (self.size * self.size)
+        tiles = self.tiles
+        for cell in range(self.size * self.size):
+            tileCells[tiles & 15] = cell
+            tiles >>= 4
+        return tileCells
+
+    def isGoal(self):
+        return self.tiles == getGoalTiles(self.size)
+
+    def legalMoves(self):
+        return [move for move, cell in getMoveTable(self.size)[self.blank]]
+
+    def result(self, move):
+        for legalMove, cell in getMoveTable(self.size)[self.blank]:
+            if legalMove == move:
+                tile = (self.tiles >> (4 * cell)) & 15
+                tiles = self.tiles ^ (tile << (4 * cell)) ^ (tile << (4 * self.blank))
+                return CompactEightPuzzleState(tiles, cell, self.size)
+        raise Exception('Illegal move: ' + str(move))
+
+    def getSuccessors(self):
+        "Returns (successor, move) for every legal move, in the order of legalMoves."
+        successors = []
+        tiles, blank, size = self.tiles, self.blank, self.size
+        for move, cell in getMoveTable(size)[blank]:
+            tile = (tiles >> (4 * cell)) & 15
+            successors.append((CompactEightPuzzleState(tiles ^ (tile << (4 * cell)) ^ (tile << (4 * blank)), cell, size), move))
+        return successors
+
+    def getCells(self):
+        numbers = self.getNumbers()
+        return [numbers[row * self.size:(row + 1) * self.size] for row in range(self.size)]
+    cells = property(getCells)
+
+    def getBlankLocation(self):
+        return divmod(self.blank, self.size)
+    blankLocation = property(getBlankLocation)
+
+    def __eq__(self, other):
+        return isinstance(other, CompactEightPuzzleState) and self.tiles == other.tiles
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.tiles)
+
+    def __str__(self):
+        return str(EightPuzzleState(self.getNumbers()))
+
+_MOVE_TABLES = {}
+_GOAL_TILES = {}
+
+def getMoveTable(size):
+    """
+      For every cell of the blank on a size x size board, the legal moves
+      together with the cell the blank moves into, in the order of
+      EightPuzzleState.legalMoves.
+    """
+    if size not in _MOVE_TABLES:
+        table = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            moves = []
+            if row != 0: moves.append(('up', cell - size))
+            if row != size - 1: moves.append(('down', cell + size))
+            if col != 0: moves.append(('left', cell - 1))
+            if col != size - 1: moves.append(('right', cell + 1))
+            table.append(tuple(moves))
+        _MOVE_TABLES[size] = table
+    return _MOVE_TABLES[size]
+
+def getGoalTiles(size):
+    "The packed tiles of the goal, with tile i in cell i."
+    if size not in _GOAL_TILES:
+        _GOAL_TILES[size] = CompactEightPuzzleState(range(size * size)).tiles
+    return _GOAL_TILES[size]
+
 # TODO: Implement The methods in this class
 
 class EightPuzzleSearchProblem(search.SearchProblem):
@@ -191,12 +341,16 @@ class EightPuzzleSearchProblem(search.SearchProblem):
 
       Each state is represented by an instance of an eightPuzzle.
     """
+    unitCosts = True
     def __init__(self,puzzle):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
+
+    def getGoalState(self):
+        return self.puzzle.__class__(range(self.puzzle.size * self.puzzle.size))
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -208,10 +362,29 @@ class EightPuzzleSearchProblem(search.SearchProblem):
           from the original state and the cost is 1.0 for each
         """
         succ = []
-        for a in state.legalMoves():
-            succ.append((state.result(a), a, 1))
+        for successor, a in state.getSuccessors():
+            succ.append((successor, a, 1))
         return succ
 
+    def getPredecessors(self,state):
+        """
+          Returns list of (predecessor, action, stepCost) triples, where
+          action leads from the predecessor to state.  Moves of the blank
+          are undone by the opposite move, so the predecessors are the
+          successors reached with the opposite actions.
+        """
+        pred = []
+        for predecessor, a in state.getSuccessors():
+            pred.append((predecessor, OPPOSITE_MOVES[a], 1))
+        return pred
+
+    def packState(self, state):
+        "Packs a puzzle into one byte per cell, for search.externalBreadthFirstSearch."
+        return array.array('B', state.getNumbers()).tostring()
+
+    def unpackState(self, data):
+        return self.puzzle.__class__(list(array.array('B', data)))
+
     def getCostOfActions(self, actions):
         """
          actions: A list of actions to take
@@ -221,6 +394,215 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+class CountingEightPuzzleSearchProblem(EightPuzzleSearchProblem):
+    "Counts the states expanded in both directions, like the Pacman problems do."
+
+    def __init__(self, puzzle):
+        EightPuzzleSearchProblem.__init__(self, puzzle)
+        self._expanded = 0
+
+    def getSuccessors(self, state):
+        self._expanded += 1
+        return EightPuzzleSearchProblem.getSuccessors(self, state)
+
+    def getPredecessors(self, state):
+        self._expanded += 1
+        return EightPuzzleSearchProblem.getPredecessors(self, state)
+
+def additivePDBHeuristic(state, problem=None):
+    """
+      The sum of the additive pattern databases for the size of the puzzle
+      (see patternDatabases.DEFAULT_PATTERNS).  It never overestimates and
+      works for the 15-puzzle too; the databases are built on first use and
+      cached on disk.
+    """
+    return patternDatabases.getPatternDatabases(state.size).getEstimate(state.getTileCells())
+
+class EightPuzzleDistances:
+    """
+      The exact number of moves from every solvable eight puzzle to the goal.
+
+      With the blank in any of the 9 cells, half of the 8! orderings of the
+      other tiles can reach the goal, and among those the first six tiles
+      determine the last two.  So a state is numbered by the cell of the
+      blank and the rank of its first six tiles: 9 * 20,160 = 181,440
+      entries of one byte.  The table is computed by a breadth-first search
+      from the goal and cached on disk like the pattern databases.
+
+      Use getEightPuzzleDistances() rather than the constructor.
+    """
+    ENTRY_COUNT = 181440
+    MAGIC = 'EPD1'
+
+    def __init__(self, cacheDirectory=None):
+        self.table = None
+        self._mmap = None
+        header = (self.MAGIC, 3, 6, self.ENTRY_COUNT)
+        fileName = None
+        if cacheDirectory != None:
+            fileName = os.path.join(cacheDirectory, 'eightPuzzleDistances.bin')
+            if os.path.exists(fileName):
+                self._mmap = patternDatabases.mapByteTable(fileName, header)
+        if self._mmap == None:
+            self.table = self._computeTable()
+            if fileName != None:
+                patternDatabases.writeByteTable(fileName, header, self.table)
+
+    def getDistance(self, state):
+        """
+          Returns the fewest moves which solve the puzzle, or None if it
+          cannot be solved.
+        """
+        numbers = state.getNumbers()
+        index = rankTiles(CompactEightPuzzleState(numbers).tiles)
+        if self.table != None:
+            distance = self.table[index]
+        else:
+            distance = ord(self._mmap[patternDatabases.TABLE_OFFSET + index])
+        # Unsolvable orderings share their index with a solvable one
+        if distance == patternDatabases.UNSEEN or not isSolvable(numbers):
+            return None
+        return distance
+
+    def _computeTable(self):
+        moveTable = getMoveTable(3)
+        table = array.array('B', [patternDatabases.UNSEEN]) * self.ENTRY_COUNT
+        goalTiles = getGoalTiles(3)
+        table[rankTiles(goalTiles)] = 0
+        layer = [(goalTiles, 0)]
+        distance = 0
+        while layer:
+            distance += 1
+            nextLayer = []
+            for tiles, blank in layer:
+                for move, cell in moveTable[blank]:
+                    tile = (tiles >> (4 * cell)) & 15
+                    nextTiles = tiles ^ (tile << (4 * cell)) ^ (tile << (4 * blank))
+                    index = rankTiles(nextTiles)
+                    if table[index] == patternDatabases.UNSEEN:
+                        table[index] = distance
+                        nextLayer.append((nextTiles, cell))
+            layer = nextLayer
+        return table
+
+_DISTANCES = []
+
+def getEightPuzzleDistances(cacheDirectory=patternDatabases.CACHE_DIRECTORY):
+    "Returns the EightPuzzleDistances, loading or computing them once per process."
+    if not _DISTANCES:
+        _DISTANCES.append(EightPuzzleDistances(cacheDirectory))
+    return _DISTANCES[0]
+
+def rankTiles(tiles):
+    """
+      The index of packed eight puzzle tiles in the distance table: the
+      cell of the blank times 20,160 plus the rank of the first six other
+      tiles.
+    """
+    index = 0
+    used = 0
+    ranked = 0
+    for cell in range(9):
+        tile = (tiles >> (4 * cell)) & 15
+        if tile == 0:
+            blank = cell
+        elif ranked < 6:
+            index = index * (8 - ranked) + tile - 1 - bin(used & ((1 << tile) - 1)).count('1')
+            used |= 1 << tile
+            ranked += 1
+    return blank * 20160 + index
+
+def isSolvable(numbers):
+    """
+      Checks whether the tiles, given row by row, can reach the goal.  On a
+      board with an odd number of columns that is the case when the tiles
+      other than the blank are out of order an even number of times; with an
+      even number of columns the row of the blank counts as well.
+
+      >>> isSolvable([1, 0, 2, 3, 4, 5, 6, 7, 8]), isSolvable([0, 2, 1, 3, 4, 5, 6, 7, 8])
+      (True, False)
+    """
+    size = int(round(len(numbers) ** 0.5))
+    tiles = [tile for tile in numbers if tile != 0]
+    inversions = 0
+    for i in range(len(tiles)):
+        for j in range(i + 1, len(tiles)):
+            if tiles[i] > tiles[j]:
+                inversions += 1
+    if size % 2 == 0:
+        inversions += numbers.index(0) // size
+    return inversions % 2 == 0
+
+def perfectHeuristic(state, problem=None):
+    """
+      The exact number of moves to the goal, read from the eight puzzle
+      distance table.  Useful to check other heuristics against, and to
+      measure the overhead of A* itself.
+    """
+    return getEightPuzzleDistances().getDistance(state)
+
+def greedyDescentSearch(problem):
+    """
+      Solves an eight puzzle without searching: every move taken lowers the
+      distance in the distance table by one.  Returns an empty list for an
+      unsolvable puzzle.
+    """
+    distances = getEightPuzzleDistances()
+    state = problem.getStartState()
+    distance = distances.getDistance(state)
+    if distance == None:
+        return []
+    actions = []
+    while distance > 0:
+        for nextState, action, cost in problem.getSuccessors(state):
+            if distances.getDistance(nextState) == distance - 1:
+                break
+        actions.append(action)
+        state = nextState
+        distance -= 1
+    return actions
+
+def checkHeuristic(heuristic, puzzles):
+    """
+      Compares a heuristic with the distance table on solvable puzzles.
+      Returns (overestimates, mean of estimate / distance), where
+      overestimates lists the (puzzle, estimate, distance) triples for which
+      the heuristic is not admissible.
+    """
+    distances = getEightPuzzleDistances()
+    overestimates = []
+    ratios = []
+    for puzzle in puzzles:
+        distance = distances.getDistance(puzzle)
+        estimate = heuristic(puzzle, EightPuzzleSearchProblem(puzzle))
+        if estimate > distance:
+            overestimates.append((puzzle, estimate, distance))
+        if distance > 0:
+            ratios.append(float(estimate) / distance)
+    meanRatio = 1.0
+    if ratios:
+        meanRatio = sum(ratios) / len(ratios)
+    return overestimates, meanRatio
+
+def checkPlanCosts(searchFunction, puzzles):
+    """
+      Solves solvable puzzles with searchFunction(problem) and compares the
+      plans with the distance table.  Returns the (puzzle, moves, distance)
+      triples of the plans which are longer than the distance or do not
+      solve the puzzle.
+    """
+    distances = getEightPuzzleDistances()
+    mistakes = []
+    for puzzle in puzzles:
+        actions = searchFunction(EightPuzzleSearchProblem(puzzle))
+        state = puzzle
+        for action in actions:
+            state = state.result(action)
+        distance = distances.getDistance(puzzle)
+        if not state.isGoal() or len(actions) != distance:
+            mistakes.append((puzzle, len(actions), distance))
+    return mistakes
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -248,15 +630,16 @@ def loadEightPuzzle(puzzleNumber):
     """
     return EightPuzzleState(EIGHT_PUZZLE_DATA[puzzleNumber])
 
-def createRandomEightPuzzle(moves=100):
+def createRandomEightPuzzle(moves=100, size=3):
     """
       moves: number of random moves to apply
+      size: the number of rows and columns; 4 makes a 15-puzzle
 
       Creates a random eight puzzle by applying
       a series of 'moves' random moves to a solved
       puzzle.
     """
-    puzzle = EightPuzzleState([0,1,2,3,4,5,6,7,8])
+    puzzle = EightPuzzleState(range(size * size))
     for i in range(moves):
         # Execute a random legal move
         puzzle = puzzle.result(random.sample(puzzle.legalMoves(), 1)[0])
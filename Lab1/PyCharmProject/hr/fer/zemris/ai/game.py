@@ -190,6 +190,7 @@ class Grid:
 
     def __eq__(self, other):
         if other == None: return False
+        if isinstance(other, BitGrid): return other == self
         return self.data == other.data
 
     def __hash__(self):
@@ -274,11 +275,169 @@ class Grid:
                 bools.append(False)
         return bools
 
-def reconstituteGrid(bitRep):
+class BitGrid:
+    """
+    A 2-dimensional array of booleans backed by a single integer, a drop-in
+    replacement for Grid.  Cell (x,y) is bit x * height + y, the same
+    numbering Grid uses in packBits and __hash__, so a BitGrid hashes equal
+    to a Grid with the same contents.
+
+    Data is still accessed via grid[x][y].  Because the bits are an immutable
+    integer, copy() takes constant time, the hash is cached until the next
+    assignment and count() is a population count.
+    """
+    CELLS_PER_INT = 30
+
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.width = width
+        self.height = height
+        self.mask = (1 << (width * height)) - 1
+        self.bits = self.mask if initialValue else 0
+        self._hash = None
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def fromGrid(grid):
+        "Returns a BitGrid with the same contents as the (list-backed) Grid."
+        g = BitGrid(grid.width, grid.height)
+        bits = 0
+        for x, y in grid.asList():
+            bits |= 1 << (x * grid.height + y)
+        g.bits = bits
+        return g
+    fromGrid = staticmethod(fromGrid)
+
+    def toGrid(self):
+        "Returns a list-backed Grid with the same contents."
+        g = Grid(self.width, self.height)
+        for x, y in self.asList():
+            g[x][y] = True
+        return g
+
+    def __getitem__(self, x):
+        if x < 0: x += self.width
+        if x < 0 or x >= self.width: raise IndexError('BitGrid column out of range')
+        return _BitGridColumn(self, x)
+
+    def getCell(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def setCell(self, x, y, value):
+        bit = 1 << (x * self.height + y)
+        if value:
+            self.bits |= bit
+        else:
+            self.bits &= ~bit
+        self._hash = None
+
+    def __str__(self):
+        out = [[str(self.getCell(x, y))[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.height == other.height and self.width == other.width
+        if isinstance(other, Grid):
+            return self.width == other.width and self.height == other.height and self.asList() == other.asList()
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        if self._hash == None:
+            self._hash = hash(self.bits)
+        return self._hash
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        g._hash = self._hash
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item =True ):
+        trueCount = bin(self.bits).count('1')
+        if item:
+            return trueCount
+        return self.width * self.height - trueCount
+
+    def asList(self, key = True):
+        bits = self.bits if key else self.mask & ~self.bits
+        height = self.height
+        list = []
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            list.append((index // height, index % height))
+            bits ^= lowest
+        return list
+
+    def packBits(self):
+        """
+        Returns the same int list representation as Grid.packBits
+
+        (width, height, bitPackedInts...)
+        """
+        cells = self.width * self.height
+        packed = [0] * (cells // self.CELLS_PER_INT + 1)
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            packed[index // self.CELLS_PER_INT] += 1 << (self.CELLS_PER_INT - (index % self.CELLS_PER_INT) - 1)
+            bits ^= lowest
+        return tuple([self.width, self.height] + packed)
+
+    def _unpackBits(self, packedInts):
+        bits = 0
+        cells = self.width * self.height
+        for chunk, packed in enumerate(packedInts):
+            if packed < 0: raise ValueError, "must be a positive integer"
+            for offset in range(self.CELLS_PER_INT):
+                if packed & (1 << (self.CELLS_PER_INT - offset - 1)):
+                    index = chunk * self.CELLS_PER_INT + offset
+                    if index < cells:
+                        bits |= 1 << index
+        self.bits = bits
+        self._hash = None
+
+class _BitGridColumn:
+    "A view of column x of a BitGrid, so that grid[x][y] reads and writes the bits."
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def __getitem__(self, y):
+        if y < 0: y += self.grid.height
+        if y < 0 or y >= self.grid.height: raise IndexError('BitGrid row out of range')
+        return self.grid.getCell(self.x, y)
+
+    def __setitem__(self, y, value):
+        if y < 0: y += self.grid.height
+        if y < 0 or y >= self.grid.height: raise IndexError('BitGrid row out of range')
+        self.grid.setCell(self.x, y, value)
+
+    def __len__(self):
+        return self.grid.height
+
+def reconstituteGrid(bitRep, gridClass=Grid):
+    """
+    Rebuilds a grid from the representation returned by packBits.  gridClass
+    selects Grid or BitGrid; grids which are not packed are returned as is.
+    """
     if type(bitRep) is not type((1,2)):
         return bitRep
     width, height = bitRep[:2]
-    return Grid(width, height, bitRepresentation= bitRep[2:])
+    return gridClass(width, height, bitRepresentation= bitRep[2:])
 
 ####################################
 # Parts you shouldn't have to read #
@@ -14,10 +14,12 @@
 
 from util import manhattanDistance
 from game import Grid
+from game import Directions, Actions
 import os
 import random
 
 VISIBILITY_MATRIX_CACHE = {}
+SEARCH_DIRECTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
 
 class Layout:
     """
@@ -35,6 +37,8 @@ class Layout:
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
+        self.buildAdjacency()
+        self.successorCaches = {}
         # self.initializeVisibilityMatrix()
 
     def getNumGhosts(self):
@@ -61,6 +65,63 @@ class Layout:
         else:
             self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
 
+    def buildAdjacency(self):
+        """
+        Numbers the free cells column by column (cellIds, cellPositions) and
+        stores the moves out of every position in neighbors, as tuples of
+        (nextPosition, action) in the order North, South, East, West used by
+        the search problems, so successor functions can iterate over them
+        without any arithmetic.  possibleActions holds the legal actions of
+        every cell in the order Actions.getPossibleActions returns them.
+
+        Moves are reversible, so predecessors holds, per position, the cells
+        it can be entered from together with the action entering it, as
+        tuples of (previousPosition, action).
+        """
+        self.cellPositions = self.walls.asList(False)
+        self.cellIds = dict([(position, i) for i, position in enumerate(self.cellPositions)])
+        self.neighbors = {}
+        self.possibleActions = {}
+        for x, y in self.cellPositions:
+            row = []
+            for direction in SEARCH_DIRECTIONS:
+                dx, dy = Actions._directions[direction]
+                nextPosition = (x + dx, y + dy)
+                if nextPosition in self.cellIds:
+                    row.append((nextPosition, direction))
+            self.neighbors[(x, y)] = tuple(row)
+            self.possibleActions[(x, y)] = [direction for direction, (dx, dy) in Actions._directionsAsList
+                                            if (x + dx, y + dy) in self.cellIds]
+        self.predecessors = {}
+        for position, row in self.neighbors.items():
+            self.predecessors[position] = tuple([(previousPosition, Actions.reverseDirection(direction))
+                                                 for previousPosition, direction in row])
+
+    def getSuccessorCache(self, costName):
+        """
+        Returns the dictionary in which search problems over this layout
+        share their successor tuples for the cost function named costName,
+        such as 'unitCost'.  Caches are kept by name rather than by function,
+        so problems built with their own functions cannot add a cache each.
+        The walls never change, so successors computed once stay valid.
+        """
+        if costName not in self.successorCaches:
+            self.successorCaches[costName] = {}
+        return self.successorCaches[costName]
+
+    def getPossibleActions(self, config):
+        """
+        The same as Actions.getPossibleActions(config, self.walls), but reads
+        the actions of agents standing on a grid point from possibleActions.
+        """
+        x, y = config.pos
+        x_int, y_int = int(x + 0.5), int(y + 0.5)
+
+        # In between grid points, all agents must continue straight
+        if (abs(x - x_int) + abs(y - y_int)  > Actions.TOLERANCE):
+            return [config.getDirection()]
+        return self.possibleActions[(x_int, y_int)][:]
+
     def isWall(self, pos):
         x, col = pos
         return self.walls[x][col]
@@ -0,0 +1,284 @@
+# mazeDistances.py
+# ----------------
+# All-pairs maze distances of a layout, computed once with a breadth-first
+# search from every free cell and cached on disk.
+#
+# Distances are stored as unsigned 16-bit integers in a cellCount x cellCount
+# matrix, where cells are the free (non-wall) positions numbered column by
+# column, as in layout.cellIds.  The matrix is written to a cache file named after a hash of the
+# walls, and later runs memory-map that file instead of searching again.
+#
+# GoalDistanceField keeps the distance to the closest of a changing set of
+# goals instead, such as the food left on the board.
+
+
+import array
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+from collections import deque
+
+UNREACHABLE = 0xFFFF
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distanceCache')
+
+_HEADER = struct.Struct('<4sIII')
+_MAGIC = 'MZD1'
+_LOADED = {}
+
+class MazeDistances:
+    """
+    Exact maze distances between any two free cells of a layout.
+
+    Use getMazeDistances(layout) rather than the constructor, so the table of
+    a layout is shared within the process and read from the disk cache.
+    """
+
+    def __init__(self, layout, cacheDirectory=None):
+        """
+        layout: the Layout, whose cell numbering and neighbors are used
+        cacheDirectory: where the table is cached; None disables the cache
+        """
+        self.width = layout.width
+        self.height = layout.height
+        self.cells = layout.cellPositions
+        self.cellIds = layout.cellIds
+        self.cellCount = len(self.cells)
+        self.key = wallsKey(layout.walls)
+        self.table = None
+        self._mmap = None
+
+        fileName = None
+        if cacheDirectory != None:
+            fileName = os.path.join(cacheDirectory, 'mazeDistances-%s.bin' % self.key)
+            if os.path.exists(fileName):
+                self._mapFile(fileName)
+        if self.table == None and self._mmap == None:
+            self.table = self._computeTable(layout)
+            if fileName != None:
+                self._writeFile(fileName)
+
+    def getDistance(self, position1, position2):
+        """
+        Returns the maze distance between two free cells, or None if there
+        is no path between them.
+        """
+        cellCount = self.cellCount
+        index = self.cellIds[position1] * cellCount + self.cellIds[position2]
+        if self.table != None:
+            distance = self.table[index]
+        else:
+            distance = struct.unpack_from('<H', self._mmap, _HEADER.size + 2 * index)[0]
+        if distance == UNREACHABLE:
+            return None
+        return distance
+
+    def getDistancesFrom(self, position):
+        "Returns a dictionary from every reachable free cell to its distance from position."
+        distances = {}
+        for cell in self.cells:
+            distance = self.getDistance(position, cell)
+            if distance != None:
+                distances[cell] = distance
+        return distances
+
+    def getClosest(self, position, candidates):
+        """
+        Returns (distance, candidate) for the reachable candidate closest to
+        position, or None if none of them can be reached.
+        """
+        best = None
+        for candidate in candidates:
+            distance = self.getDistance(position, candidate)
+            if distance != None and (best == None or distance < best[0]):
+                best = (distance, candidate)
+        return best
+
+    def _computeTable(self, layout):
+        cellCount = self.cellCount
+        cellIds = self.cellIds
+        neighbors = [[cellIds[neighbor] for neighbor, action in layout.neighbors[cell]] for cell in self.cells]
+
+        table = array.array('H')
+        unreachableRow = array.array('H', [UNREACHABLE]) * cellCount
+        for source in range(cellCount):
+            row = array.array('H', unreachableRow)
+            row[source] = 0
+            frontier = [source]
+            distance = 0
+            while frontier:
+                distance += 1
+                if distance >= UNREACHABLE:
+                    raise Exception('Maze distances do not fit in 16 bits')
+                nextFrontier = []
+                for cellId in frontier:
+                    for neighbor in neighbors[cellId]:
+                        if row[neighbor] == UNREACHABLE:
+                            row[neighbor] = distance
+                            nextFrontier.append(neighbor)
+                frontier = nextFrontier
+            table.extend(row)
+        return table
+
+    def _writeFile(self, fileName):
+        "Writes the table atomically, so concurrent runs never read half a file."
+        directory = os.path.dirname(fileName)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = array.array('H', self.table)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        temporaryName = '%s.%d.tmp' % (fileName, os.getpid())
+        f = open(temporaryName, 'wb')
+        try:
+            f.write(_HEADER.pack(_MAGIC, self.width, self.height, self.cellCount))
+            data.tofile(f)
+        finally:
+            f.close()
+        os.rename(temporaryName, fileName)
+
+    def _mapFile(self, fileName):
+        "Memory-maps a cached table, ignoring files which do not match the walls."
+        f = open(fileName, 'rb')
+        try:
+            size = os.fstat(f.fileno()).st_size
+            if size != _HEADER.size + 2 * self.cellCount * self.cellCount:
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        magic, width, height, cellCount = _HEADER.unpack_from(mapped, 0)
+        if (magic, width, height, cellCount) != (_MAGIC, self.width, self.height, self.cellCount):
+            mapped.close()
+            return
+        self._mmap = mapped
+
+class GoalDistanceField:
+    """
+    The maze distance from every free cell to the closest of a set of goal
+    cells, such as the remaining food.  It is computed once with a
+    breadth-first search from all goals together and repaired in place when
+    a goal is removed, so a path to the closest goal is found by walking
+    downhill instead of searching.
+    """
+
+    def __init__(self, neighbors, goals):
+        """
+        neighbors: a dictionary from each free cell to its (cell, action)
+          neighbors, as in layout.neighbors
+        goals: the goal cells
+        """
+        self.neighbors = neighbors
+        self.goals = set(goals)
+        self.distances = dict.fromkeys(neighbors, UNREACHABLE)
+        frontier = list(self.goals)
+        for cell in frontier:
+            self.distances[cell] = 0
+        distance = 0
+        while frontier:
+            distance += 1
+            nextFrontier = []
+            for cell in frontier:
+                for neighbor, action in neighbors[cell]:
+                    if self.distances[neighbor] == UNREACHABLE:
+                        self.distances[neighbor] = distance
+                        nextFrontier.append(neighbor)
+            frontier = nextFrontier
+
+    def getDistance(self, position):
+        "Returns the distance from position to the closest goal, or None if no goal can be reached."
+        distance = self.distances[position]
+        if distance == UNREACHABLE:
+            return None
+        return distance
+
+    def removeGoal(self, position):
+        """
+        Removes a goal and repairs the distances it raised, D* Lite style.
+        Cells are checked in order of their old distance, and a cell which
+        no longer has a neighbor one step closer is raised to unreachable,
+        which makes its farther neighbors check again.  The raised cells
+        are then lowered again from their unaffected neighbors with a
+        search over the raised cells only.  Returns the number of cells
+        whose distance was raised.
+        """
+        if position not in self.goals:
+            return 0
+        self.goals.discard(position)
+        neighbors, distances = self.neighbors, self.distances
+
+        # Raise the cells which lost their way to a goal
+        raised = []
+        queue = deque([position])
+        while queue:
+            cell = queue.popleft()
+            distance = distances[cell]
+            if distance == UNREACHABLE or cell in self.goals:
+                continue
+            supported = False
+            for neighbor, action in neighbors[cell]:
+                if distances[neighbor] == distance - 1:
+                    supported = True
+                    break
+            if supported:
+                continue
+            distances[cell] = UNREACHABLE
+            raised.append(cell)
+            for neighbor, action in neighbors[cell]:
+                if distances[neighbor] == distance + 1:
+                    queue.append(neighbor)
+
+        # Lower them again from the cells which kept their distances
+        heap = []
+        for cell in raised:
+            best = UNREACHABLE
+            for neighbor, action in neighbors[cell]:
+                if distances[neighbor] + 1 < best:
+                    best = distances[neighbor] + 1
+            if best < UNREACHABLE:
+                heapq.heappush(heap, (best, cell))
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance >= distances[cell]:
+                continue
+            distances[cell] = distance
+            for neighbor, action in neighbors[cell]:
+                if distance + 1 < distances[neighbor]:
+                    heapq.heappush(heap, (distance + 1, neighbor))
+        return len(raised)
+
+    def descend(self, position):
+        """
+        Returns the actions of a shortest path from position to the closest
+        goal, always stepping to the first neighbor one step closer.  The
+        path is empty if position is a goal or no goal can be reached.
+        """
+        distances = self.distances
+        distance = distances[position]
+        if distance == UNREACHABLE:
+            return []
+        actions = []
+        while distance > 0:
+            for neighbor, action in self.neighbors[position]:
+                if distances[neighbor] == distance - 1:
+                    break
+            actions.append(action)
+            position = neighbor
+            distance -= 1
+        return actions
+
+def wallsKey(walls):
+    "A hash of the walls, which are all the maze distances depend on."
+    return hashlib.md5('%d,%d\n%s' % (walls.width, walls.height, str(walls))).hexdigest()
+
+def getMazeDistances(layout, cacheDirectory=CACHE_DIRECTORY):
+    """
+    Returns the MazeDistances of a Layout, computing or loading them only
+    the first time a layout with these walls is seen in this process.
+    """
+    key = wallsKey(layout.walls)
+    if key not in _LOADED:
+        _LOADED[key] = MazeDistances(layout, cacheDirectory)
+    return _LOADED[key]
@@ -0,0 +1,216 @@
+# patternDatabases.py
+# -------------------
+# Additive pattern databases for the eight puzzle and larger sliding puzzles.
+#
+# A pattern is a set of tiles.  Its database holds, for every placement of
+# those tiles on the board, the fewest moves of pattern tiles needed to bring
+# them to their goal cells; moves of the other tiles are free.  The tiles of
+# disjoint patterns never share a move, so the values of all databases of a
+# partition can be added and still never overestimate.
+#
+# Databases are built with a breadth-first search backwards from the goal and
+# stored as one byte per placement.  They are written to a cache file named
+# after the board size and the tiles, and later runs memory-map that file.
+
+
+import array
+import mmap
+import os
+import struct
+
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distanceCache')
+
+# Disjoint partitions of the tiles, by the number of rows of the board.  The
+# goal has the blank in the top left corner and tile i in cell i.
+DEFAULT_PATTERNS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)],
+}
+
+UNSEEN = 0xFF
+
+_HEADER = struct.Struct('<4sIII')
+TABLE_OFFSET = _HEADER.size
+_MAGIC = 'PDB1'
+_LOADED = {}
+
+class PatternDatabase:
+    """
+    The database of one pattern on a size x size board.
+
+    Use getPatternDatabases(size) rather than the constructor, so the
+    databases are shared within the process and read from the disk cache.
+    """
+
+    def __init__(self, size, tiles, cacheDirectory=None):
+        """
+        size: the number of rows (and columns) of the board
+        tiles: the tiles of the pattern, which must not include the blank 0
+        cacheDirectory: where the database is cached; None disables the cache
+        """
+        self.size = size
+        self.tiles = tuple(tiles)
+        self.cellCount = size * size
+        self.entryCount = 1
+        for i in range(len(self.tiles)):
+            self.entryCount *= self.cellCount - i
+        self.table = None
+        self._mmap = None
+
+        fileName = None
+        if cacheDirectory != None:
+            name = 'pdb-%d-%s.bin' % (size, '-'.join([str(tile) for tile in self.tiles]))
+            fileName = os.path.join(cacheDirectory, name)
+            if os.path.exists(fileName):
+                self._mapFile(fileName)
+        if self._mmap == None:
+            self.table = self._computeTable()
+            if fileName != None:
+                self._writeFile(fileName)
+
+    def getValue(self, cellOfTile):
+        """
+        Returns the fewest pattern moves for the placement in which tile t is
+        in cell cellOfTile[t].
+        """
+        index = rankCells([cellOfTile[tile] for tile in self.tiles], self.cellCount)
+        if self.table != None:
+            return self.table[index]
+        return ord(self._mmap[TABLE_OFFSET + index])
+
+    def _computeTable(self):
+        """
+        Breadth-first search over placements of the pattern tiles.  The blank
+        is not tracked: a step slides a pattern tile into any neighbouring
+        cell which no pattern tile takes, as the free moves of the other
+        tiles can always bring the blank there.  This keeps neighbouring
+        placements within one move of each other, so the estimate is
+        consistent as well as admissible.
+        """
+        cellCount = self.cellCount
+        neighbors = getCellNeighbors(self.size)
+        table = array.array('B', [UNSEEN]) * self.entryCount
+        start = tuple(self.tiles)
+        table[rankCells(start, cellCount)] = 0
+        layer = [start]
+        distance = 0
+        while layer:
+            distance += 1
+            if distance >= UNSEEN:
+                raise Exception('Pattern distances do not fit in a byte')
+            nextLayer = []
+            for cells in layer:
+                occupied = cellMask(cells)
+                for tileIndex, cell in enumerate(cells):
+                    for neighbor in neighbors[cell]:
+                        if occupied & (1 << neighbor):
+                            continue
+                        nextCells = cells[:tileIndex] + (neighbor,) + cells[tileIndex + 1:]
+                        index = rankCells(nextCells, cellCount)
+                        if table[index] == UNSEEN:
+                            table[index] = distance
+                            nextLayer.append(nextCells)
+            layer = nextLayer
+        return table
+
+    def _writeFile(self, fileName):
+        writeByteTable(fileName, (_MAGIC, self.size, len(self.tiles), self.entryCount), self.table)
+
+    def _mapFile(self, fileName):
+        "Memory-maps a cached table, ignoring files which do not match the pattern."
+        self._mmap = mapByteTable(fileName, (_MAGIC, self.size, len(self.tiles), self.entryCount))
+
+class AdditivePatternDatabases:
+    "The databases of a partition of the tiles, whose values are added."
+
+    def __init__(self, size, patterns, cacheDirectory=None):
+        self.size = size
+        self.databases = [PatternDatabase(size, tiles, cacheDirectory) for tiles in patterns]
+
+    def getEstimate(self, cellOfTile):
+        "Returns the sum of the database values of the puzzle with tile t in cell cellOfTile[t]."
+        total = 0
+        for database in self.databases:
+            total += database.getValue(cellOfTile)
+        return total
+
+def writeByteTable(fileName, header, table):
+    """
+    Writes an array of bytes after a header of a 4 character magic string
+    and three numbers.  The file is written atomically, so concurrent runs
+    never read half a file.
+    """
+    directory = os.path.dirname(fileName)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    temporaryName = '%s.%d.tmp' % (fileName, os.getpid())
+    f = open(temporaryName, 'wb')
+    try:
+        f.write(_HEADER.pack(*header))
+        table.tofile(f)
+    finally:
+        f.close()
+    os.rename(temporaryName, fileName)
+
+def mapByteTable(fileName, header):
+    """
+    Memory-maps a file written by writeByteTable.  Returns None if its
+    header differs or its size does not match the entry count, which is the
+    last number of the header.  Entry i is at offset TABLE_OFFSET + i.
+    """
+    f = open(fileName, 'rb')
+    try:
+        if os.fstat(f.fileno()).st_size != TABLE_OFFSET + header[-1]:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    if _HEADER.unpack_from(mapped, 0) != header:
+        mapped.close()
+        return None
+    return mapped
+
+def rankCells(cells, cellCount):
+    """
+    Numbers the ordered selections of distinct cells from 0 to
+    cellCount! / (cellCount - len(cells))! - 1.
+    """
+    index = 0
+    used = 0
+    for i, cell in enumerate(cells):
+        smaller = bin(used & ((1 << cell) - 1)).count('1')
+        index = index * (cellCount - i) + cell - smaller
+        used |= 1 << cell
+    return index
+
+def cellMask(cells):
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+def getCellNeighbors(size):
+    "The cells next to every cell of a size x size board, numbered row by row."
+    neighbors = []
+    for cell in range(size * size):
+        row, col = divmod(cell, size)
+        cellNeighbors = []
+        if row > 0: cellNeighbors.append(cell - size)
+        if row < size - 1: cellNeighbors.append(cell + size)
+        if col > 0: cellNeighbors.append(cell - 1)
+        if col < size - 1: cellNeighbors.append(cell + 1)
+        neighbors.append(cellNeighbors)
+    return neighbors
+
+def getPatternDatabases(size, patterns=None, cacheDirectory=CACHE_DIRECTORY):
+    """
+    Returns the AdditivePatternDatabases of a partition of the tiles of a
+    size x size puzzle (DEFAULT_PATTERNS if none is given), building or
+    loading them only the first time they are asked for in this process.
+    """
+    if patterns == None:
+        patterns = DEFAULT_PATTERNS[size]
+    key = (size, tuple([tuple(tiles) for tiles in patterns]))
+    if key not in _LOADED:
+        _LOADED[key] = AdditivePatternDatabases(size, patterns, cacheDirectory)
+    return _LOADED[key]
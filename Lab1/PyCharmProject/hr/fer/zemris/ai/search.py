@@ -17,8 +17,19 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import traceback
+from Queue import Empty as QueueEmpty
+
 import util
-import copy
 
 class SearchNode:
     """
@@ -29,6 +40,9 @@ class SearchNode:
     REMINDER: You need to fill in the backtrack function in this class!
     """
 
+    # False while heuristic only holds a lower bound (see genericSearchAlt)
+    heuristicExact = True
+
     def __init__(self, position, parent=None, transition=None, cost=0, heuristic=0):
         """
         Basic constructor which copies the values. Remember, you can access all the 
@@ -62,17 +76,84 @@ class SearchNode:
         final node to the initial.
         """
         moves = []
-        # make a deep copy to stop any referencing isues.
-        node = copy.deepcopy(self)
+        # Walk the parent links once; nodes are never modified after creation,
+        # so there is no need to copy them.
+        node = self
+        while not node.isRootNode():
+            moves.append(node.transition)
+            node = node.parent
+        moves.reverse()
+        return moves
 
-        if node.isRootNode(): 
-            # The initial state is the final state
-            return moves        
 
-        "**YOUR CODE HERE**"
-        moves=self.parent.backtrack()
-        moves.append(self.transition)
-        return moves
+class SearchStats:
+    """
+    Collects measurements of a single run of genericSearchAlt.  Pass an
+    instance as the stats argument of a search function; searches run
+    without one only pay for a few comparisons against None.
+    """
+
+    FIELDS = ['generated', 'expanded', 'duplicatesPruned', 'heuristicEvaluations',
+              'peakFrontier', 'peakClosed', 'wallTime', 'expansionsPerSecond', 'bytesPerNode']
+
+    def __init__(self):
+        self.generated = 0
+        self.expanded = 0
+        self.duplicatesPruned = 0
+        self.heuristicEvaluations = 0
+        self.peakFrontier = 0
+        self.peakClosed = 0
+        self.wallTime = 0.0
+        self.bytesPerNode = 0
+        self._startTime = None
+
+    def start(self):
+        self._startTime = time.time()
+
+    def stop(self):
+        if self._startTime != None:
+            self.wallTime += time.time() - self._startTime
+            self._startTime = None
+
+    def measureNode(self, node):
+        """
+        Records the approximate size of a search node: the node object, its
+        attribute dictionary and the shallow size of its state.
+        """
+        self.bytesPerNode = (sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+                             + sys.getsizeof(node.position))
+
+    def expansionsPerSecond(self):
+        if self.wallTime <= 0:
+            return 0.0
+        return self.expanded / self.wallTime
+
+    def asDict(self):
+        values = dict(self.__dict__)
+        del values['_startTime']
+        values['expansionsPerSecond'] = self.expansionsPerSecond()
+        return values
+
+    def toJSON(self):
+        return json.dumps(self.asDict(), sort_keys=True)
+
+    def writeJSON(self, fileName):
+        f = open(fileName, 'w')
+        try:
+            json.dump(self.asDict(), f, sort_keys=True, indent=2)
+        finally:
+            f.close()
+
+    def __str__(self):
+        values = self.asDict()
+        lines = []
+        for field in self.FIELDS:
+            value = values[field]
+            if isinstance(value, float):
+                lines.append('  %-20s %.4f' % (field, value))
+            else:
+                lines.append('  %-20s %d' % (field, value))
+        return '\n'.join(lines)
 
 
 class SearchProblem:
@@ -127,7 +208,7 @@ def tinyMazeSearch(problem):
     w = Directions.WEST
     return  [s, s, w, s, w, w, s, w]
 
-def depthFirstSearch(problem):
+def depthFirstSearch(problem, stats=None):
     """
     Search the deepest nodes in the search tree first.
 
@@ -142,18 +223,34 @@ def depthFirstSearch(problem):
     print "Start's successors:", problem.getSuccessors(problem.getStartState())
     """
 
-    return genericSearchAlt(problem, util.Stack())
+    return genericSearchAlt(problem, util.Stack(), stats=stats)
 
-def breadthFirstSearch(problem):
-    """Search the shallowest nodes in the search tree first."""
+def breadthFirstSearch(problem, stats=None, goalOnGeneration=False):
+    """
+    Search the shallowest nodes in the search tree first.
+
+    With goalOnGeneration successors are tested for the goal as soon as
+    they are generated, which saves expanding the last layer; the path is
+    still the shortest as long as every step costs the same.
+    """
 
-    return genericSearchAlt(problem, util.Queue()) #PriorityQueueWithFunction(len)
+    return genericSearchAlt(problem, util.Queue(), stats=stats, goalOnGeneration=goalOnGeneration) #PriorityQueueWithFunction(len)
+
+def earlyGoalBreadthFirstSearch(problem, stats=None):
+    "Breadth first search which tests for the goal on generation."
+    return genericSearchAlt(problem, util.Queue(), stats=stats, goalOnGeneration=True)
+
+def uniformCostSearch(problem, tieBreak=None, stats=None):
+    """
+    Search the node of least total cost first.
 
-def uniformCostSearch(problem):
-    """Search the node of least total cost first."""
+    Integral path costs are queued in buckets (see
+    util.BucketPriorityQueueWithFunction); tieBreak optionally orders nodes of
+    equal cost, e.g. preferDeeper.
+    """
 
     f= lambda state: state.cost
-    return genericSearchAlt(problem, util.PriorityQueueWithFunction(f))
+    return genericSearchAlt(problem, util.BucketPriorityQueueWithFunction(f, tieBreak), stats=stats)
 
 def nullHeuristic(state, problem=None):
     """
@@ -162,20 +259,96 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
+def preferDeeper(node):
+    """
+    Tie-breaking key for nodes of equal priority which pops the node with the
+    highest path cost first.  On A* plateaus this follows one path towards
+    the goal instead of expanding all of them side by side.
+    """
+    return -node.cost
+
+def aStarSearch(problem, heuristic=nullHeuristic, tieBreak=None, stats=None, lazyHeuristic=False):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    Integral priorities are queued in buckets (see
+    util.BucketPriorityQueueWithFunction); tieBreak optionally orders nodes of
+    equal priority, e.g. preferDeeper.  lazyHeuristic evaluates the
+    heuristic only for popped nodes (see genericSearchAlt).
+    """
+
+    f= lambda state: state.cost + state.heuristic
+    return genericSearchAlt(problem, util.BucketPriorityQueueWithFunction(f, tieBreak),heuristic,stats,
+                            lazyHeuristic=lazyHeuristic)
 
+def lazyAStarSearch(problem, heuristic=nullHeuristic, stats=None):
+    """
+    A* which evaluates the heuristic only for the nodes it pops; worth it
+    when the heuristic is expensive.
+    """
     f= lambda state: state.cost + state.heuristic
-    return genericSearchAlt(problem, util.PriorityQueueWithFunction(f),heuristic)
+    return genericSearchAlt(problem, util.BucketPriorityQueueWithFunction(f), heuristic, stats,
+                            lazyHeuristic=True)
+
+def genericSearchAlt(problem,open,heuristic=nullHeuristic,stats=None,
+                     lazyHeuristic=False,goalOnGeneration=False):
+    """
+    Graph search over the open nodes list; stats is an optional SearchStats
+    which is filled in while searching.
+
+    Options, all off by default:
+      lazyHeuristic: successors are queued with a lower bound of their
+        heuristic, the parent's value less the step cost, and the heuristic
+        is evaluated only when a node is popped, at most once per state.  A
+        node whose true value is higher is queued again.  Consistent
+        heuristics never fall below the bound, so nodes are expanded in the
+        same order of f.
+      goalOnGeneration: successors are tested for the goal when they are
+        generated rather than when they are popped.  The path is only the
+        shortest for breadth first search with equal step costs.
 
-def genericSearchAlt(problem,open,heuristic=nullHeuristic):
-    open.push(SearchNode( problem.getStartState()) )
+    stats.heuristicEvaluations does not count calls of nullHeuristic.
+    """
+    collecting = stats != None
+    if collecting:
+        stats.start()
+        frontierSize = 1
+        stats.generated += 1
+    startNode = SearchNode( problem.getStartState())
+    if lazyHeuristic:
+        startNode.heuristicExact = False
+        # The heuristic of every state evaluated, as a state may be queued more than once
+        estimates = {}
+    open.push(startNode)
     #closed=[] #- firstImplementation
     closed=set()
     while not open.isEmpty():
         searchNode=open.pop()
         state=searchNode.position
-        if problem.isGoalState(state):
+        if collecting:
+            frontierSize -= 1
+        if not searchNode.heuristicExact:
+            if state in closed:
+                if collecting:
+                    stats.duplicatesPruned += 1
+                continue
+            searchNode.heuristicExact = True
+            if state in estimates:
+                estimate = estimates[state]
+            else:
+                estimate = estimates[state] = heuristic(state, problem)
+                if collecting and heuristic is not nullHeuristic:
+                    stats.heuristicEvaluations += 1
+            if estimate > searchNode.heuristic:
+                searchNode.heuristic = estimate
+                open.push(searchNode)
+                if collecting:
+                    frontierSize += 1
+                continue
+        if (not goalOnGeneration or searchNode.isRootNode()) and problem.isGoalState(state):
+            if collecting:
+                stats.measureNode(searchNode)
+                stats.stop()
             return searchNode.backtrack()
         # If this state was explored before due to a priority insertion, skip it.
         # Good for: PriorityQueueWithFunction open nodes list implementation.
@@ -187,12 +360,1205 @@ def genericSearchAlt(problem,open,heuristic=nullHeuristic):
                 # If the successor state has already been expanded, skip this insertion.
                 # Good for Stack and Queue open nodes list implementations.
                 if succPosition not in closed:
-                    nextNode=SearchNode(succPosition, searchNode, succAction, prevCost+succCost, heuristic(succPosition,problem))
+                    if lazyHeuristic:
+                        nextNode=SearchNode(succPosition, searchNode, succAction, prevCost+succCost,
+                                            max(0, searchNode.heuristic - succCost))
+                        nextNode.heuristicExact = False
+                    else:
+                        nextNode=SearchNode(succPosition, searchNode, succAction, prevCost+succCost, heuristic(succPosition,problem))
+                        if collecting and heuristic is not nullHeuristic:
+                            stats.heuristicEvaluations += 1
+                    if goalOnGeneration and problem.isGoalState(succPosition):
+                        if collecting:
+                            stats.generated += 1
+                            stats.measureNode(nextNode)
+                            stats.stop()
+                        return nextNode.backtrack()
                     open.push(nextNode)
+                    if collecting:
+                        frontierSize += 1
+                        stats.generated += 1
+                elif collecting:
+                    stats.duplicatesPruned += 1
+            if collecting:
+                stats.expanded += 1
+                if frontierSize > stats.peakFrontier:
+                    stats.peakFrontier = frontierSize
+                if len(closed) > stats.peakClosed:
+                    stats.peakClosed = len(closed)
+        elif collecting:
+            stats.duplicatesPruned += 1
+    if collecting:
+        stats.stop()
+    return []
+
+def indexedUniformCostSearch(problem):
+    """
+    Uniform cost search which keeps a single frontier entry per state and
+    lowers its cost in place when a cheaper path to it is found.
+    """
+    return genericSearchIndexed(problem)
+
+def indexedAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    A* search which keeps a single frontier entry per state and lowers its
+    cost in place when a cheaper path to it is found.
+    """
+    return genericSearchIndexed(problem, heuristic)
+
+def genericSearchIndexed(problem, heuristic=nullHeuristic):
+    """
+    Best-first search over util.IndexedPriorityQueue.  Expands states in the
+    same order as genericSearchAlt with a PriorityQueueWithFunction, but a
+    duplicate successor either replaces the queued node (decrease-key) or is
+    dropped, so the frontier holds at most one node per distinct state and
+    the heuristic is evaluated once per state.
+    """
+    open = util.IndexedPriorityQueue()
+    startState = problem.getStartState()
+    startNode = SearchNode(startState, heuristic=heuristic(startState, problem))
+    open.push(startState, startNode, startNode.heuristic)
+    closed = set()
+    while not open.isEmpty():
+        searchNode = open.pop()
+        state = searchNode.position
+        if problem.isGoalState(state):
+            return searchNode.backtrack()
+        closed.add(state)
+        prevCost = searchNode.cost
+        for succPosition, succAction, succCost in problem.getSuccessors(state):
+            if succPosition in closed:
+                continue
+            cost = prevCost + succCost
+            if succPosition in open:
+                queued = open.getItem(succPosition)
+                if queued.cost <= cost:
+                    continue
+                succHeuristic = queued.heuristic
+            else:
+                succHeuristic = heuristic(succPosition, problem)
+            nextNode = SearchNode(succPosition, searchNode, succAction, cost, succHeuristic)
+            open.push(succPosition, nextNode, cost + succHeuristic)
+    return []
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic, maxTableSize=100000):
+    """
+    IDA*: repeated depth first searches which cut off every path whose
+    cost plus heuristic exceeds a bound, raising the bound to the smallest
+    value cut off until a goal is found.  Only the current path is kept, so
+    memory stays linear in the depth of the solution.
+
+    A transposition table of at most maxTableSize states remembers the
+    cheapest cost each state was reached with during an iteration and prunes
+    costlier visits; 0 disables it.  Once the table is full, new states are
+    no longer added.
+    """
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    bound = heuristic(startState, problem)
+    while True:
+        nextBound = None
+        table = {}
+        pathStates, pathCosts, actions = [startState], [0], []
+        onPath = set([startState])
+        successors = [iter(problem.getSuccessors(startState))]
+        while successors:
+            try:
+                succPosition, succAction, succCost = successors[-1].next()
+            except StopIteration:
+                successors.pop()
+                onPath.discard(pathStates.pop())
+                pathCosts.pop()
+                if actions:
+                    actions.pop()
+                continue
+            if succPosition in onPath:
+                continue
+            cost = pathCosts[-1] + succCost
+            estimate = cost + heuristic(succPosition, problem)
+            if estimate > bound:
+                if nextBound == None or estimate < nextBound:
+                    nextBound = estimate
+                continue
+            if maxTableSize:
+                if succPosition in table:
+                    if table[succPosition] <= cost:
+                        continue
+                    table[succPosition] = cost
+                elif len(table) < maxTableSize:
+                    table[succPosition] = cost
+            if problem.isGoalState(succPosition):
+                return actions + [succAction]
+            pathStates.append(succPosition)
+            pathCosts.append(cost)
+            actions.append(succAction)
+            onPath.add(succPosition)
+            successors.append(iter(problem.getSuccessors(succPosition)))
+        if nextBound == None:
+            # Nothing was cut off, so the whole space has been searched
+            return []
+        bound = nextBound
+
+class MemoryBoundedNode(SearchNode):
+    """
+    A SearchNode of memoryBoundedAStarSearch.  Besides the SearchNode fields
+    it holds its f value, depth, the children currently in memory and the
+    best f values of the children which were forgotten to free memory.
+    """
+
+    def __init__(self, position, parent=None, transition=None, cost=0, heuristic=0):
+        SearchNode.__init__(self, position, parent, transition, cost, heuristic)
+        self.f = cost + heuristic
+        self.depth = 0
+        if parent != None:
+            self.depth = parent.depth + 1
+            self.f = max(self.f, parent.f)
+        self.children = set()
+        self.forgotten = {}
+
+    def isOnPath(self, state):
+        "Checks whether state is the state of this node or one of its ancestors."
+        node = self
+        while node != None:
+            if node.position == state:
+                return True
+            node = node.parent
+        return False
+
+def memoryBoundedAStarSearch(problem, heuristic=nullHeuristic, maxNodes=100000):
+    """
+    SMA*: A* which keeps at most maxNodes search nodes in memory.  When the
+    limit is reached the leaf with the highest f value (the shallowest among
+    equals) is forgotten.  Its parent remembers that f value and is queued
+    again, so the forgotten subtree is only generated again once it looks
+    the most promising.
+
+    The solution is optimal if its path fits in memory; if no solution does,
+    an empty list is returned.  Successors already held in memory with a
+    cost no higher are not generated again.
+    """
+    INFINITY = float('inf')
+    root = MemoryBoundedNode(problem.getStartState(), heuristic=heuristic(problem.getStartState(), problem))
+    # Leaves, and expanded nodes some of whose children were forgotten
+    leaves = util.DoubleEndedPriorityQueue()
+    partial = util.DoubleEndedPriorityQueue()
+    leaves.push(root, root, (root.f, -root.depth))
+    inMemory = {root.position: root}
+    nodeCount = 1
+
+    def forget(node):
+        "Removes a leaf from memory and backs its f value up into its parent."
+        parent = node.parent
+        if node in leaves:
+            leaves.remove(node)
+        if inMemory.get(node.position) is node:
+            del inMemory[node.position]
+        parent.children.discard(node)
+        parent.forgotten[node.position] = min(node.f, parent.forgotten.get(node.position, INFINITY))
+        priority = (min(parent.forgotten.values()), -parent.depth)
+        if parent.children:
+            partial.push(parent, parent, priority)
+        else:
+            if parent in partial:
+                partial.remove(parent)
+            parent.f = priority[0]
+            leaves.push(parent, parent, priority)
+
+    while not leaves.isEmpty() or not partial.isEmpty():
+        queue = leaves
+        if leaves.isEmpty() or (not partial.isEmpty() and partial.getMinPriority() < leaves.getMinPriority()):
+            queue = partial
+        if queue.getMinPriority()[0] == INFINITY:
+            return []
+        searchNode = queue.popMin()
+        state = searchNode.position
+        if queue is leaves and problem.isGoalState(state):
+            return searchNode.backtrack()
+
+        # Generate the successors which are not in memory
+        forgotten, searchNode.forgotten = searchNode.forgotten, {}
+        present = set([child.position for child in searchNode.children])
+        for succPosition, succAction, succCost in problem.getSuccessors(state):
+            if succPosition in present or searchNode.isOnPath(succPosition):
+                continue
+            cost = searchNode.cost + succCost
+            known = inMemory.get(succPosition)
+            if known != None and known.cost <= cost:
+                continue
+            child = MemoryBoundedNode(succPosition, searchNode, succAction, cost, heuristic(succPosition, problem))
+            if succPosition in forgotten:
+                child.f = max(child.f, forgotten[succPosition])
+            if child.depth >= maxNodes - 1 and not problem.isGoalState(succPosition):
+                # The path to any of its successors cannot fit in memory
+                child.f = INFINITY
+            searchNode.children.add(child)
+            inMemory[succPosition] = child
+            leaves.push(child, child, (child.f, -child.depth))
+            nodeCount += 1
+
+        if not searchNode.children:
+            if searchNode.parent == None:
+                return []
+            # A dead end: remember it as unreachable and free its memory
+            searchNode.f = INFINITY
+            forget(searchNode)
+            nodeCount -= 1
+        else:
+            # Back the lowest f value of the children up the tree
+            node = searchNode
+            while node != None:
+                f = min([child.f for child in node.children] + node.forgotten.values())
+                if f <= node.f:
+                    break
+                node.f = f
+                node = node.parent
+
+        while nodeCount > maxNodes and not leaves.isEmpty():
+            forget(leaves.peekMax())
+            nodeCount -= 1
     return []
 
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, deadline=None, initialWeight=3.0, weightStep=0.5):
+    """
+    ARA*: weighted A* which first finds a solution quickly, with the
+    heuristic multiplied by initialWeight, then lowers the weight by
+    weightStep and repairs the search instead of starting over, until the
+    weight reaches 1 and the solution is optimal or the deadline passes.
+    Each solution costs at most the current weight times the optimum.
+
+    deadline is the number of seconds of wall-clock time the search may
+    take; None searches until the solution is optimal.  The first solution
+    is always completed, even after the deadline.  Returns the best
+    solution found.
+    """
+    INFINITY = float('inf')
+    endTime = None
+    if deadline != None:
+        endTime = time.time() + float(deadline)
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    costs = {startState: 0}
+    parents = {startState: None}
+    estimates = {}
+
+    def estimate(state):
+        "The heuristic of a state, which is evaluated once however often the state is queued."
+        if state not in estimates:
+            estimates[state] = heuristic(state, problem)
+        return estimates[state]
+
+    weight = max(1.0, float(initialWeight))
+    open = util.IndexedPriorityQueue()
+    open.push(startState, startState, (weight * estimate(startState), estimate(startState)))
+    # States whose cost was lowered after they were expanded with this weight
+    inconsistent = set()
+    goal = None
+    goalCost = INFINITY
+    while True:
+        closed = set()
+        timedOut = False
+        while not open.isEmpty() and open.getMinPriority()[0] < goalCost:
+            if goal != None and endTime != None and time.time() > endTime:
+                timedOut = True
+                break
+            priority, state = open.popEntry()
+            closed.add(state)
+            cost = costs[state]
+            for succPosition, succAction, succCost in problem.getSuccessors(state):
+                nextCost = cost + succCost
+                if nextCost >= costs.get(succPosition, INFINITY):
+                    continue
+                costs[succPosition] = nextCost
+                parents[succPosition] = (state, succAction)
+                if problem.isGoalState(succPosition):
+                    if nextCost < goalCost:
+                        goal, goalCost = succPosition, nextCost
+                elif succPosition in closed:
+                    inconsistent.add(succPosition)
+                else:
+                    open.push(succPosition, succPosition, (nextCost + weight * estimate(succPosition), estimate(succPosition)))
+        if goal == None:
+            return []
+        if timedOut or weight <= 1.0 or (endTime != None and time.time() > endTime):
+            break
+
+        # Queue the inconsistent states again under the lower weight
+        states = list(inconsistent)
+        while not open.isEmpty():
+            states.append(open.popEntry()[1])
+        if not states or goalCost <= min([costs[state] + estimate(state) for state in states]):
+            # No queued state can lead to a cheaper solution
+            break
+        weight = max(1.0, weight - weightStep)
+        inconsistent = set()
+        for state in states:
+            open.push(state, state, (costs[state] + weight * estimate(state), estimate(state)))
+
+    actions = []
+    link = parents[goal]
+    while link != None:
+        state, action = link
+        actions.append(action)
+        link = parents[state]
+    actions.reverse()
+    return actions
+
+class ReverseSearchProblem(SearchProblem):
+    """
+    The search problem of a bidirectional search running from the goal
+    towards the start.  Its successors are the predecessors of the original
+    problem, and its goal attribute is the original start state, so position
+    heuristics which measure the distance to problem.goal estimate the
+    distance back to the start.  Other attributes are read from the original
+    problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def getStartState(self):
+        return self.problem.getGoalState()
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return self.problem.getPredecessors(state)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+class BidirectionalFrontier:
+    """
+    One direction of a bidirectional search: the open nodes, the best node
+    found so far for every generated state and the expanded states.
+    """
+
+    def __init__(self, startState, expand, heuristic):
+        "expand (state) -> [(nextState, action, stepCost)]; heuristic (state) -> estimate"
+        self.expand = expand
+        self.heuristic = heuristic
+        self.open = util.PriorityQueue()
+        self.nodes = {}
+        self.closed = set()
+        self.push(SearchNode(startState, heuristic=heuristic(startState)))
+
+    def push(self, node):
+        "Queues node with the priority max(f, 2g) of MM search."
+        self.nodes[node.position] = node
+        self.open.push(node, max(node.cost + node.heuristic, 2 * node.cost))
+
+    def getMinPriority(self):
+        "The lowest priority of a queued node which is still the best for its state."
+        open = self.open
+        while not open.isEmpty():
+            node = open.peek()
+            if self.nodes[node.position] is node and node.position not in self.closed:
+                return open.getMinPriority()
+            open.pop()
+        return None
+
+def bidirectionalBreadthFirstSearch(problem):
+    """
+    Breadth first search from the start and from the goal at the same time,
+    always expanding the smaller of the two frontiers by a whole layer.  The
+    path with the fewest actions is returned.
+
+    Besides the usual methods the problem must provide getGoalState(), its
+    single goal state, and getPredecessors(state), which returns triples of
+    (predecessor, action, stepCost) with action leading from the predecessor
+    to state.
+    """
+    startState = problem.getStartState()
+    goalState = problem.getGoalState()
+    if startState == goalState:
+        return []
+    forward = {startState: SearchNode(startState)}
+    backward = {goalState: SearchNode(goalState)}
+    forwardLayer, backwardLayer = [startState], [goalState]
+    while forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            layer, nodes, otherNodes, expand = forwardLayer, forward, backward, problem.getSuccessors
+        else:
+            layer, nodes, otherNodes, expand = backwardLayer, backward, forward, problem.getPredecessors
+        # Finish the whole layer, as a later meeting in it may be shorter
+        nextLayer = []
+        best = None
+        for state in layer:
+            node = nodes[state]
+            for succPosition, succAction, succCost in expand(state):
+                if succPosition in nodes:
+                    continue
+                nextNode = SearchNode(succPosition, node, succAction, node.cost + 1)
+                nodes[succPosition] = nextNode
+                nextLayer.append(succPosition)
+                if succPosition in otherNodes:
+                    length = nextNode.cost + otherNodes[succPosition].cost
+                    if best == None or length < best[0]:
+                        best = (length, succPosition)
+        if best != None:
+            return joinPaths(forward[best[1]], backward[best[1]])
+        if nodes is forward:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+    return []
+
+def bidirectionalUniformCostSearch(problem):
+    """
+    Uniform cost search from the start and from the goal at the same time.
+    See bidirectionalBreadthFirstSearch for what the problem must provide.
+    """
+    return genericBidirectionalSearch(problem)
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic, backwardHeuristic=nullHeuristic):
+    """
+    Front-to-end bidirectional A* which meets in the middle (MM search).  The
+    forward search estimates the cost to the goal with heuristic(state,
+    problem); the backward search estimates the cost to the start with
+    backwardHeuristic(state, ReverseSearchProblem(problem)).  Heuristics
+    which measure the distance to problem.goal, like manhattanHeuristic, can
+    be given for both; those which only know one goal, like the eight
+    puzzle's, overestimate backwards and must not be.  See
+    bidirectionalBreadthFirstSearch for what the problem must provide.
+    """
+    return genericBidirectionalSearch(problem, heuristic, backwardHeuristic)
+
+def genericBidirectionalSearch(problem, heuristic=nullHeuristic, backwardHeuristic=nullHeuristic):
+    """
+    MM search: both directions queue nodes by max(g + h, 2g) and the
+    direction with the lower priority is expanded.  Every generated state
+    which the other direction has also reached gives a path through it; the
+    search stops once the cheapest of those costs no more than the lower
+    bound given by the two queues.  If both heuristics are admissible in
+    their direction the path is optimal.
+    """
+    startState = problem.getStartState()
+    goalState = problem.getGoalState()
+    if startState == goalState:
+        return []
+    reverseProblem = ReverseSearchProblem(problem)
+    forward = BidirectionalFrontier(startState, problem.getSuccessors,
+                                    lambda state: heuristic(state, problem))
+    backward = BidirectionalFrontier(goalState, problem.getPredecessors,
+                                     lambda state: backwardHeuristic(state, reverseProblem))
+    bestCost, meeting = None, None
+    while True:
+        forwardPriority = forward.getMinPriority()
+        backwardPriority = backward.getMinPriority()
+        if forwardPriority == None or backwardPriority == None:
+            break
+        bound = min(forwardPriority, backwardPriority)
+        if heuristic == nullHeuristic and backwardHeuristic == nullHeuristic:
+            # Without a heuristic priorities are 2g, so the cheapest path
+            # still to be found costs at least the sum of the smallest g
+            bound = max(bound, (forwardPriority + backwardPriority) / 2.0)
+        if bestCost != None and bestCost <= bound:
+            break
+
+        if forwardPriority <= backwardPriority:
+            frontier, other = forward, backward
+        else:
+            frontier, other = backward, forward
+        searchNode = frontier.open.pop()
+        state = searchNode.position
+        frontier.closed.add(state)
+        prevCost = searchNode.cost
+        for succPosition, succAction, succCost in frontier.expand(state):
+            cost = prevCost + succCost
+            if succPosition in frontier.nodes:
+                queued = frontier.nodes[succPosition]
+                if queued.cost <= cost:
+                    continue
+                # A cheaper path reopens the state
+                frontier.closed.discard(succPosition)
+                succHeuristic = queued.heuristic
+            else:
+                succHeuristic = frontier.heuristic(succPosition)
+            nextNode = SearchNode(succPosition, searchNode, succAction, cost, succHeuristic)
+            frontier.push(nextNode)
+            if succPosition in other.nodes:
+                pathCost = cost + other.nodes[succPosition].cost
+                if bestCost == None or pathCost < bestCost:
+                    bestCost = pathCost
+                    if frontier is forward:
+                        meeting = (nextNode, other.nodes[succPosition])
+                    else:
+                        meeting = (other.nodes[succPosition], nextNode)
+    if meeting == None:
+        return []
+    return joinPaths(*meeting)
+
+def joinPaths(forwardNode, backwardNode):
+    """
+    Returns the actions from the start to the goal through the state of
+    forwardNode and backwardNode.  The transitions of backward nodes already
+    lead towards the goal, so they are read in order.
+    """
+    moves = forwardNode.backtrack()
+    node = backwardNode
+    while not node.isRootNode():
+        moves.append(node.transition)
+        node = node.parent
+    return moves
+
+_RECORD_LENGTH = struct.Struct('<H')
+
+def writeRecords(fileName, records):
+    "Writes byte strings to a file, each after its length.  Returns the number written."
+    count = 0
+    f = open(fileName, 'wb')
+    try:
+        for record in records:
+            f.write(_RECORD_LENGTH.pack(len(record)))
+            f.write(record)
+            count += 1
+    finally:
+        f.close()
+    return count
+
+def readRecords(fileName):
+    "Yields the byte strings of a file written by writeRecords, in order."
+    f = open(fileName, 'rb')
+    try:
+        while True:
+            header = f.read(_RECORD_LENGTH.size)
+            if not header:
+                return
+            yield f.read(_RECORD_LENGTH.unpack(header)[0])
+    finally:
+        f.close()
+
+def subtractSorted(records, excluded):
+    """
+    Yields the records of a sorted iterable without repeats and without
+    the records of the sorted iterable excluded, in one merging pass.
+    """
+    excluded = iter(excluded)
+    current = next(excluded, None)
+    previous = None
+    for record in records:
+        if record == previous:
+            continue
+        previous = record
+        while current != None and current < record:
+            current = next(excluded, None)
+        if record != current:
+            yield record
+
+def externalBreadthFirstSearch(problem, bufferSize=100000, directory=None, undirected=False):
+    """
+    Breadth first search which keeps its layers in temporary files instead
+    of memory.  The problem packs states into byte strings and back with
+    problem.packState and problem.unpackState; equal states must pack to
+    equal strings.
+
+    The successors of a layer are collected in a buffer of at most
+    bufferSize packed states, which is sorted and written out as a run
+    whenever it fills up.  Duplicates are detected late: the runs are
+    merged into the next layer, dropping repeats and every state of the
+    earlier layers.  Those are kept merged in one sorted file; with
+    undirected, where every step can be undone, only the last two layers
+    need to be checked.
+
+    The path is recovered from the layers on disk by searching each one,
+    from the goal back, for a state with the next state as a successor.
+    directory is where the temporary files go (the system default if None).
+    """
+    pack, unpack = problem.packState, problem.unpackState
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    workDirectory = tempfile.mkdtemp(prefix='ebfs', dir=directory)
+    fileCount = [0]
+
+    def newFile():
+        fileCount[0] += 1
+        return os.path.join(workDirectory, '%d.bin' % fileCount[0])
+
+    def writeRun(buffer):
+        fileName = newFile()
+        buffer.sort()
+        writeRecords(fileName, buffer)
+        return fileName
+
+    try:
+        layers = [newFile()]
+        writeRecords(layers[0], [pack(startState)])
+        seen = layers[0]
+        goal = None
+        while goal == None:
+            # Expand the last layer into sorted runs
+            runs = []
+            buffer = []
+            for packed in readRecords(layers[-1]):
+                state = unpack(packed)
+                for succPosition, succAction, succCost in problem.getSuccessors(state):
+                    if problem.isGoalState(succPosition):
+                        goal = (state, succAction)
+                        break
+                    buffer.append(pack(succPosition))
+                    if len(buffer) >= bufferSize:
+                        runs.append(writeRun(buffer))
+                        buffer = []
+                if goal != None:
+                    break
+            if goal != None:
+                break
+            if buffer:
+                runs.append(writeRun(buffer))
+            if not runs:
+                return []
+
+            # Merge the runs into the next layer, dropping states seen before
+            if undirected:
+                excluded = heapq.merge(*[readRecords(layer) for layer in layers[-2:]])
+            else:
+                excluded = readRecords(seen)
+            merged = heapq.merge(*[readRecords(run) for run in runs])
+            layer = newFile()
+            count = writeRecords(layer, subtractSorted(merged, excluded))
+            for run in runs:
+                os.remove(run)
+            if count == 0:
+                return []
+            layers.append(layer)
+            if not undirected:
+                nextSeen = newFile()
+                writeRecords(nextSeen, heapq.merge(readRecords(seen), readRecords(layer)))
+                if seen != layers[0]:
+                    os.remove(seen)
+                seen = nextSeen
+
+        # Walk back through the layers from the parent of the goal
+        state, action = goal
+        actions = [action]
+        target = pack(state)
+        for layer in reversed(layers[:-1]):
+            for packed in readRecords(layer):
+                previousState = unpack(packed)
+                for succPosition, succAction, succCost in problem.getSuccessors(previousState):
+                    if pack(succPosition) == target:
+                        break
+                else:
+                    continue
+                actions.append(succAction)
+                target = packed
+                break
+        actions.reverse()
+        return actions
+    finally:
+        shutil.rmtree(workDirectory, True)
+
+class HashDistributedWorker:
+    """
+    One worker of hashDistributedAStarSearch.  It owns the states whose
+    encoding hashes to its index and keeps, for each of them, the cheapest
+    cost it has been reached with and the owner-independent link to its
+    parent.  Successors owned by other workers are sent to them in batches.
+    """
+
+    def __init__(self, problem, heuristic, index, inboxes, results, shared, batchSize):
+        self.problem = problem
+        self.heuristic = heuristic
+        self.index = index
+        self.inboxes = inboxes
+        self.inbox = inboxes[index]
+        self.results = results
+        self.lock, self.sent, self.received, self.idle, self.bound, self.stop = shared
+        self.batchSize = batchSize
+        self.encode = getattr(problem, 'encodeState', lambda state: state)
+        self.decode = getattr(problem, 'decodeState', lambda code: code)
+        # code -> (cost, parent code, action)
+        self.table = {}
+        self.open = []
+        self.count = 0
+        self.expanded = 0
+        self.goal = None
+        self.goalCost = float('inf')
+
+    def run(self):
+        reported = False
+        while True:
+            if self.stop.value and not reported:
+                self.results.put((self.index, self.expanded, self.goal, self.goalCost))
+                reported = True
+            working = not reported and self.hasWork()
+            if not working and not reported:
+                self.lock.acquire()
+                self.idle[self.index] = 1
+                self.lock.release()
+            message = self.receive(not working)
+            while message is not None:
+                if message[0] == 'quit':
+                    return
+                self.handle(message)
+                message = self.receive(False)
+            if not reported:
+                self.expand()
+
+    def receive(self, block):
+        try:
+            if block:
+                return self.inbox.get(True, 0.01)
+            return self.inbox.get_nowait()
+        except QueueEmpty:
+            return None
+
+    def handle(self, message):
+        if message[0] == 'trace':
+            self.results.put(self.table[message[1]][1:])
+            return
+        # Counting the batch and leaving the idle state together keeps the
+        # coordinator from seeing an idle worker with nothing in flight
+        self.lock.acquire()
+        self.received[self.index] += 1
+        self.idle[self.index] = 0
+        self.lock.release()
+        for code, cost, parent, action in message[1]:
+            self.insert(code, cost, parent, action)
+
+    def insert(self, code, cost, parent, action):
+        "Records a path to a state this worker owns, queueing the state if the path is the cheapest yet."
+        known = self.table.get(code)
+        if known is not None and known[0] <= cost:
+            return
+        self.table[code] = (cost, parent, action)
+        state = self.decode(code)
+        if self.problem.isGoalState(state):
+            if cost < self.goalCost:
+                self.goal, self.goalCost = code, cost
+                self.lock.acquire()
+                if cost < self.bound.value:
+                    self.bound.value = cost
+                self.lock.release()
+            return
+        f = cost + self.heuristic(state, self.problem)
+        heapq.heappush(self.open, (f, -cost, self.count, code, state))
+        self.count += 1
+
+    def hasWork(self):
+        "Drops stale queue entries and checks whether any queued state could lead to a cheaper goal."
+        open = self.open
+        while open:
+            f, negativeCost, count, code, state = open[0]
+            if self.table[code][0] != -negativeCost:
+                heapq.heappop(open)
+                continue
+            return f < self.bound.value
+        return False
+
+    def expand(self):
+        "Expands up to batchSize states and sends the successors owned by other workers."
+        workerCount = len(self.inboxes)
+        outboxes = [[] for i in range(workerCount)]
+        for i in range(self.batchSize):
+            if not self.hasWork():
+                break
+            f, negativeCost, count, code, state = heapq.heappop(self.open)
+            self.expanded += 1
+            for succPosition, succAction, succCost in self.problem.getSuccessors(state):
+                succCode = self.encode(succPosition)
+                owner = hash(succCode) % workerCount
+                if owner == self.index:
+                    self.insert(succCode, succCost - negativeCost, code, succAction)
+                else:
+                    outboxes[owner].append((succCode, succCost - negativeCost, code, succAction))
+        for owner in range(workerCount):
+            if outboxes[owner]:
+                self.lock.acquire()
+                self.sent[self.index] += 1
+                self.lock.release()
+                self.inboxes[owner].put(('nodes', outboxes[owner]))
+
+def hashDistributedAStarSearch(problem, heuristic=nullHeuristic, workers=None, batchSize=64):
+    """
+    HDA*: A* spread over worker processes.  Every state is owned by the
+    worker its hash selects, which alone keeps its cost, evaluates its
+    heuristic and expands it; successors are sent to their owners over
+    queues.  Workers expand their own cheapest states without waiting for
+    each other, so a state may be reopened when a cheaper path reaches it.
+
+    Goals found lower a shared bound.  The search ends when every worker
+    is idle (no queued state has f below the bound) and every batch sent
+    has been received, which confirms that no cheaper solution is left.
+    The path is then traced back through the owners of its states.
+
+    States cross process boundaries through problem.encodeState and
+    problem.decodeState if the problem has them; otherwise states must be
+    picklable themselves.  The workers are forked, so the problem and the
+    heuristic do not need to be.  workers defaults to the number of CPUs.
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, int(workers))
+    encode = getattr(problem, 'encodeState', lambda state: state)
+    INFINITY = float('inf')
+    lock = multiprocessing.Lock()
+    # The last slot of sent counts the start state sent by this process
+    sent = multiprocessing.Array('l', workers + 1, lock=False)
+    received = multiprocessing.Array('l', workers, lock=False)
+    idle = multiprocessing.Array('b', workers, lock=False)
+    bound = multiprocessing.Value('d', INFINITY, lock=False)
+    stop = multiprocessing.Value('b', 0, lock=False)
+    shared = (lock, sent, received, idle, bound, stop)
+    inboxes = [multiprocessing.Queue() for i in range(workers)]
+    results = multiprocessing.Queue()
+
+    processes = []
+    for index in range(workers):
+        worker = HashDistributedWorker(problem, heuristic, index, inboxes, results, shared, int(batchSize))
+        process = multiprocessing.Process(target=worker.run)
+        process.daemon = True
+        process.start()
+        processes.append(process)
+
+    try:
+        start = encode(problem.getStartState())
+        sent[workers] = 1
+        inboxes[hash(start) % workers].put(('nodes', [(start, 0, None, None)]))
+
+        # Termination detection
+        while True:
+            lock.acquire()
+            done = min(idle) == 1 and sum(sent) == sum(received)
+            lock.release()
+            if done:
+                break
+            for process in processes:
+                if not process.is_alive():
+                    raise Exception('A search worker died')
+            time.sleep(0.002)
+        stop.value = 1
+
+        reports = [results.get() for i in range(workers)]
+        if '_expanded' in dir(problem):
+            problem._expanded += sum([report[1] for report in reports])
+        goal, goalCost = None, INFINITY
+        for index, expanded, code, cost in reports:
+            if code is not None and cost < goalCost:
+                goal, goalCost = code, cost
+        if goal is None:
+            return []
+
+        actions = []
+        code = goal
+        while True:
+            inboxes[hash(code) % workers].put(('trace', code))
+            parent, action = results.get()
+            if parent is None:
+                break
+            actions.append(action)
+            code = parent
+        actions.reverse()
+        return actions
+    finally:
+        for inbox in inboxes:
+            inbox.put(('quit',))
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+
+def waypointTourSearch(problem, maxExact=16):
+    """
+    Plans a shortest route through every waypoint of a problem such as
+    searchAgents.WaypointsProblem, which gives the distances between the
+    start (point 0) and its waypoints with getLegDistances() and the
+    actions between two points with getLegActions(i, j).
+
+    The order of the waypoints is exact (heldKarpOrder) for up to maxExact
+    waypoints.  Above that, whose table would not fit in time or memory in
+    Python, the nearest neighbor order is improved with 2-opt and Or-opt
+    moves (improveOrder).  Returns an empty list if a waypoint cannot be
+    reached.
+    """
+    distances = problem.getLegDistances()
+    for row in distances:
+        if None in row:
+            return []
+    if len(distances) - 1 <= maxExact:
+        order = heldKarpOrder(distances)
+    else:
+        order = improveOrder(distances, nearestNeighborOrder(distances))
+    actions = []
+    for i in range(len(order) - 1):
+        actions += problem.getLegActions(order[i], order[i + 1])
+    return actions
+
+def heldKarpOrder(distances):
+    """
+    The order of the points 1 to n which, starting from point 0, visits
+    them all with the least total distance, by dynamic programming over the
+    subsets of visited points (Held-Karp): O(2 ** n * n ** 2) time and
+    O(2 ** n * n) memory.  The route does not return to point 0.
+    """
+    n = len(distances) - 1
+    if n <= 0:
+        return [0]
+    INFINITY = float('inf')
+    # cost[mask * n + j]: the shortest route from 0 through the points of
+    # mask which ends at point j + 1; parent holds the point before it
+    cost = [INFINITY] * ((1 << n) * n)
+    parent = [-1] * ((1 << n) * n)
+    for j in range(n):
+        cost[(1 << j) * n + j] = distances[0][j + 1]
+    for mask in xrange(1, 1 << n):
+        row = mask * n
+        for j in range(n):
+            c = cost[row + j]
+            if c == INFINITY:
+                continue
+            fromJ = distances[j + 1]
+            for k in range(n):
+                if mask & (1 << k):
+                    continue
+                index = (mask | (1 << k)) * n + k
+                nextCost = c + fromJ[k + 1]
+                if nextCost < cost[index]:
+                    cost[index] = nextCost
+                    parent[index] = j
+
+    mask = (1 << n) - 1
+    last = min(range(n), key=lambda j: cost[mask * n + j])
+    order = []
+    while last != -1:
+        order.append(last + 1)
+        previous = parent[mask * n + last]
+        mask &= ~(1 << last)
+        last = previous
+    order.append(0)
+    order.reverse()
+    return order
+
+def nearestNeighborOrder(distances):
+    "Starting from point 0, always visits the closest point not yet visited."
+    order = [0]
+    left = set(range(1, len(distances)))
+    while left:
+        row = distances[order[-1]]
+        nearest = min(left, key=lambda point: (row[point], point))
+        order.append(nearest)
+        left.remove(nearest)
+    return order
+
+def orderLength(distances, order):
+    return sum([distances[order[i]][order[i + 1]] for i in range(len(order) - 1)])
+
+def improveOrder(distances, order):
+    """
+    Shortens a route which starts at point 0 (and does not return) until
+    neither move helps: 2-opt, which reverses a stretch of the route, and
+    Or-opt, which moves a stretch of one to three points elsewhere, either
+    way round.  Distances are assumed to be symmetric.
+    """
+    order = list(order)
+    d = distances
+
+    def gap(a, b):
+        "The distance between the points at positions a and b, where b may be past the end."
+        if b >= len(order):
+            return 0
+        return d[order[a]][order[b]]
+
+    improved = True
+    while improved:
+        improved = False
+        # 2-opt: reverse order[i:k + 1]
+        for i in range(1, len(order) - 1):
+            for k in range(i + 1, len(order)):
+                delta = (d[order[i - 1]][order[k]] + gap(i, k + 1)
+                         - d[order[i - 1]][order[i]] - gap(k, k + 1))
+                if delta < 0:
+                    order[i:k + 1] = order[i:k + 1][::-1]
+                    improved = True
+        # Or-opt: move order[i:i + length] between two other neighbors
+        for length in (1, 2, 3):
+            i = 1
+            while i + length <= len(order):
+                segment = order[i:i + length]
+                rest = order[:i] + order[i + length:]
+                removed = (d[order[i - 1]][segment[0]] + gap(i + length - 1, i + length)
+                           - gap(i - 1, i + length))
+                best = None
+                for position in range(1, len(rest) + 1):
+                    if position == i:
+                        continue
+                    before = rest[position - 1]
+                    for candidate in (segment, segment[::-1]):
+                        added = d[before][candidate[0]]
+                        if position < len(rest):
+                            added += d[candidate[-1]][rest[position]] - d[before][rest[position]]
+                        if added < removed and (best == None or added < best[0]):
+                            best = (added, position, candidate)
+                if best != None:
+                    added, position, candidate = best
+                    order = rest[:position] + candidate + rest[position:]
+                    improved = True
+                i += 1
+    return order
+
+# Search functions which return optimal solutions, given admissible heuristics
+OPTIMAL_SEARCHES = set(['uniformCostSearch', 'aStarSearch', 'lazyAStarSearch', 'indexedUniformCostSearch',
+                        'indexedAStarSearch', 'iterativeDeepeningAStarSearch', 'memoryBoundedAStarSearch',
+                        'anytimeRepairingAStarSearch', 'hashDistributedAStarSearch',
+                        'bidirectionalUniformCostSearch', 'bidirectionalAStarSearch'])
+
+# Search functions which return optimal solutions only if every step costs the same
+UNIT_COST_OPTIMAL_SEARCHES = set(['breadthFirstSearch', 'earlyGoalBreadthFirstSearch',
+                                  'externalBreadthFirstSearch', 'bidirectionalBreadthFirstSearch'])
+
+# The optimality of a PortfolioSearch member which depends on hasUnitCosts
+UNIT_COSTS = 'unitCosts'
+
+def hasUnitCosts(problem):
+    """
+    Whether every step of the problem costs the same.  Problems declare it
+    with a unitCosts attribute; those without one are assumed not to.
+    """
+    return getattr(problem, 'unitCosts', False)
+
+def isValidPlan(problem, actions):
+    "Checks that the actions can be taken one after another from the start and end in a goal."
+    state = problem.getStartState()
+    for action in actions:
+        for succPosition, succAction, succCost in problem.getSuccessors(state):
+            if succAction == action:
+                state = succPosition
+                break
+        else:
+            return False
+    return problem.isGoalState(state)
+
+class PortfolioSearch:
+    """
+    Races several searches of one problem in worker processes and returns
+    the plan of the first optimal member to finish; the other workers are
+    terminated.  The workers are forked, so the problem and the search
+    functions do not need to be picklable, but the plans must be.
+
+    members is a list of (name, searchFunction, optimal) triples, where
+    searchFunction(problem) returns a list of actions.  A member declares
+    optimal True if its plans are always the cheapest, UNIT_COSTS if they
+    are the cheapest only on problems with hasUnitCosts, and False
+    otherwise; a search with a heuristic which may overestimate is not
+    optimal.  Plans of members which are not optimal for the problem are
+    kept until every optimal member has failed, and then the cheapest one
+    is returned.  With firstValid, the first valid plan of any member wins.
+    timeout is the number of seconds to wait for the workers; None waits
+    until they are done.
+
+    After a search, winner holds the name of the member whose plan was
+    returned (None if no member found one), results maps the names of the
+    members which finished to their (cost, expanded, seconds) and failures
+    maps the names of the members which raised an exception to its
+    traceback.  If no member found a plan and any of them raised, the
+    search raises an exception listing the failures.
+    """
+
+    def __init__(self, members, firstValid=False, timeout=None):
+        self.members = members
+        self.firstValid = firstValid
+        self.timeout = timeout
+        self.winner = None
+        self.results = {}
+        self.failures = {}
+
+    def __call__(self, problem):
+        self.winner = None
+        self.results = {}
+        self.failures = {}
+        unitCosts = hasUnitCosts(problem)
+        results = multiprocessing.Queue()
+        workers = []
+        for index in range(len(self.members)):
+            worker = multiprocessing.Process(target=self._run, args=(problem, index, results))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        endTime = None
+        if self.timeout != None:
+            endTime = time.time() + float(self.timeout)
+
+        best = None
+        try:
+            for i in range(len(workers)):
+                try:
+                    if endTime == None:
+                        index, actions, cost, expanded, seconds, failure = results.get()
+                    else:
+                        index, actions, cost, expanded, seconds, failure = results.get(True, max(0, endTime - time.time()))
+                except QueueEmpty:
+                    break
+                name, searchFunction, optimal = self.members[index]
+                if failure != None:
+                    self.failures[name] = failure
+                    print('[PortfolioSearch] %s failed:\n%s' % (name, failure.rstrip()))
+                if actions == None:
+                    continue
+                optimal = optimal == True or (optimal == UNIT_COSTS and unitCosts)
+                self.results[name] = (cost, expanded, seconds)
+                if best == None or cost < best[0]:
+                    best = (cost, index, actions, expanded)
+                if optimal or self.firstValid:
+                    best = (cost, index, actions, expanded)
+                    break
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+        if best == None:
+            if self.failures:
+                raise Exception('No portfolio member found a plan; %s raised an exception' %
+                                ', '.join(sorted(self.failures.keys())))
+            return []
+        cost, index, actions, expanded = best
+        self.winner = self.members[index][0]
+        if '_expanded' in dir(problem):
+            problem._expanded = expanded
+        return actions
+
+    def _run(self, problem, index, results):
+        """
+        Runs one member in a worker and puts its (index, actions, cost,
+        expanded, seconds, failure) on results, where failure is the
+        traceback of an exception the member raised, or None.
+        """
+        start = time.time()
+        try:
+            actions = self.members[index][1](problem)
+            seconds = time.time() - start
+            expanded = getattr(problem, '_expanded', None)
+            if not isValidPlan(problem, actions):
+                actions = None
+                cost = None
+            else:
+                cost = problem.getCostOfActions(actions)
+        except Exception:
+            results.put((index, None, None, None, time.time() - start, traceback.format_exc()))
+            return
+        results.put((index, actions, cost, expanded, seconds, None))
+
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+iastar = indexedAStarSearch
+iucs = indexedUniformCostSearch
+bibfs = bidirectionalBreadthFirstSearch
+biucs = bidirectionalUniformCostSearch
+biastar = bidirectionalAStarSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = memoryBoundedAStarSearch
+arastar = anytimeRepairingAStarSearch
+lazyastar = lazyAStarSearch
+egbfs = earlyGoalBreadthFirstSearch
+tour = waypointTourSearch
+hdastar = hashDistributedAStarSearch
+ebfs = externalBreadthFirstSearch
@@ -38,9 +38,13 @@ from bdb import foo
 from game import Directions
 from game import Agent
 from game import Actions
+from game import BitGrid
+import binascii
+import struct
 import util
 import time
 import search
+import mazeDistances
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -57,6 +61,11 @@ class GoWestAgent(Agent):
 #       after you fill in parts of search.py          #
 #######################################################
 
+# Heuristics which never overestimate, so portfolio members using them count
+# as optimal (see SearchAgent.getPortfolio)
+ADMISSIBLE_HEURISTICS = set(['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic',
+                             'foodMazeHeuristic', 'foodMSTHeuristic'])
+
 class SearchAgent(Agent):
     """
     This very general search agent finds a path using a supplied search
@@ -70,20 +79,60 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    With stats set, search functions which take a stats argument fill in a
+    search.SearchStats which is printed after the search; statsFile also
+    writes it to that file as JSON.
+
+    Anytime search functions such as arastar take a deadline, the number of
+    seconds they may search before returning the best path found so far.
+
+    Several functions or heuristics joined with '+' race each other in a
+    search.PortfolioSearch, e.g. fn=astar+ucs or
+    fn=astar,heuristic=foodHeuristic+strategyTwo; a function may name its
+    own heuristic as in fn=astar:foodHeuristic+bfs.  The first optimal plan
+    wins, or with firstValid the first valid one; portfolioTimeout limits
+    the seconds to wait.  Searches count as optimal only with heuristics in
+    ADMISSIBLE_HEURISTICS, and breadth first searches only on problems
+    whose steps all cost the same.
+
+    biastar estimates the cost back to the start with backwardHeuristic,
+    which is nullHeuristic unless given, as in
+    fn=biastar,heuristic=manhattanHeuristic,backwardHeuristic=manhattanHeuristic.
+
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    # Search statistics are off unless __init__ turns them on, so subclasses
+    # which set their own searchFunction and searchType need not set these
+    collectStats = False
+    statsFile = None
+    searchStats = None
+
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic',
+                 stats=False, statsFile=None, deadline=None, firstValid=False, portfolioTimeout=None,
+                 backwardHeuristic=None):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
+        # Race several functions or heuristics against each other
+        if '+' in fn or '+' in heuristic:
+            if stats not in [False, 'False', 'false', '0'] or statsFile != None:
+                raise AttributeError, 'portfolio searches do not collect search statistics.'
+            if backwardHeuristic != None:
+                raise AttributeError, 'portfolio searches do not take a backward heuristic.'
+            self.searchFunction = self.getPortfolio(fn, heuristic, deadline,
+                                                    firstValid not in [False, 'False', 'false', '0'],
+                                                    portfolioTimeout)
+            self.searchType = self.getSearchType(prob)
+            return
+
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError, fn + ' is not a search function in search.py.'
         func = getattr(search, fn)
         if 'heuristic' not in func.func_code.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            heur = None
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -92,14 +141,97 @@ class SearchAgent(Agent):
             else:
                 raise AttributeError, heuristic + ' is not a function in searchAgents.py or search.py.'
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
-            # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
 
-        # Get the search problem type from the name
+        # Bidirectional searches estimate the cost back to the start separately
+        backwardHeur = None
+        if backwardHeuristic != None:
+            if 'backwardHeuristic' not in func.func_code.co_varnames:
+                raise AttributeError, fn + ' does not take a backward heuristic.'
+            if backwardHeuristic in globals().keys():
+                backwardHeur = globals()[backwardHeuristic]
+            elif backwardHeuristic in dir(search):
+                backwardHeur = getattr(search, backwardHeuristic)
+            else:
+                raise AttributeError, backwardHeuristic + ' is not a function in searchAgents.py or search.py.'
+            print('[SearchAgent] using backward heuristic ' + backwardHeuristic)
+
+        # Collect search statistics if asked to and the function supports it
+        self.statsFile = statsFile
+        self.collectStats = (statsFile != None or stats not in [False, 'False', 'false', '0'])
+        if self.collectStats and 'stats' not in func.func_code.co_varnames:
+            raise AttributeError, fn + ' does not collect search statistics.'
+
+        # Give anytime search functions the seconds they may take
+        if deadline != None:
+            if 'deadline' not in func.func_code.co_varnames:
+                raise AttributeError, fn + ' does not take a deadline.'
+            deadline = float(deadline)
+
+        # Note: this bit of Python trickery combines the search algorithm and its options
+        def searchFunction(problem):
+            arguments = {}
+            if heur != None: arguments['heuristic'] = heur
+            if backwardHeur != None: arguments['backwardHeuristic'] = backwardHeur
+            if self.collectStats: arguments['stats'] = self.searchStats
+            if deadline != None: arguments['deadline'] = deadline
+            return func(problem, **arguments)
+        self.searchFunction = searchFunction
+
+        self.searchType = self.getSearchType(prob)
+
+    def getSearchType(self, prob):
+        "Gets the search problem type from the name."
         if prob not in globals().keys() or not prob.endswith('Problem'):
             raise AttributeError, prob + ' is not a search problem type in SearchAgents.py.'
-        self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
+        return globals()[prob]
+
+    def getPortfolio(self, fn, heuristic, deadline, firstValid, timeout):
+        """
+        Builds a search.PortfolioSearch of every function in fn (separated
+        by '+') with every heuristic in heuristic, or with the heuristic
+        named after a ':' in the function.
+        """
+        members = []
+        for entry in fn.split('+'):
+            name, heuristicNames = entry, heuristic.split('+')
+            if ':' in entry:
+                name, heuristicName = entry.split(':', 1)
+                heuristicNames = [heuristicName]
+            if name not in dir(search):
+                raise AttributeError, name + ' is not a search function in search.py.'
+            func = getattr(search, name)
+            arguments = {}
+            if deadline != None and 'deadline' in func.func_code.co_varnames:
+                arguments['deadline'] = float(deadline)
+            optimal = False
+            if 'deadline' not in arguments:
+                if func.__name__ in search.OPTIMAL_SEARCHES:
+                    optimal = True
+                elif func.__name__ in search.UNIT_COST_OPTIMAL_SEARCHES:
+                    optimal = search.UNIT_COSTS
+            if 'heuristic' not in func.func_code.co_varnames:
+                members.append((name, self.bindSearch(func, arguments), optimal))
+                continue
+            for heuristicName in heuristicNames:
+                if heuristicName in globals().keys():
+                    heur = globals()[heuristicName]
+                elif heuristicName in dir(search):
+                    heur = getattr(search, heuristicName)
+                else:
+                    raise AttributeError, heuristicName + ' is not a function in searchAgents.py or search.py.'
+                heuristicArguments = dict(arguments, heuristic=heur)
+                heuristicOptimal = optimal
+                if heuristicName not in ADMISSIBLE_HEURISTICS:
+                    heuristicOptimal = False
+                members.append(('%s:%s' % (name, heuristicName), self.bindSearch(func, heuristicArguments),
+                                heuristicOptimal))
+        print('[SearchAgent] racing %s' % ', '.join([member[0] for member in members]))
+        return search.PortfolioSearch(members, firstValid, timeout)
+
+    def bindSearch(self, func, arguments):
+        "Returns a function of the problem which calls func with the keyword arguments."
+        return lambda problem: func(problem, **arguments)
 
     def registerInitialState(self, state):
         """
@@ -113,10 +245,16 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception, "No search function provided for SearchAgent"
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
+        if self.collectStats: self.searchStats = search.SearchStats()
         self.actions  = self.searchFunction(problem) # Find a path
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if isinstance(self.searchFunction, search.PortfolioSearch):
+            print('Portfolio winner: %s' % self.searchFunction.winner)
+        if self.collectStats:
+            print('Search statistics:\n%s' % self.searchStats)
+            if self.statsFile != None: self.searchStats.writeJSON(self.statsFile)
 
     def getAction(self, state):
         """
@@ -134,6 +272,22 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+# Byte encodings of search states (see search.externalBreadthFirstSearch)
+POSITION_CODEC = struct.Struct('<HH')
+CORNERS_CODEC = struct.Struct('<HHI')
+
+def packBits(bits, bitCount):
+    "Packs an integer of at most bitCount bits into a fixed number of bytes, most significant first."
+    byteCount = max(1, (bitCount + 7) // 8)
+    return binascii.unhexlify('%0*x' % (2 * byteCount, bits))
+
+def unpackBits(data):
+    return int(binascii.hexlify(data), 16)
+
+def unitCost(position):
+    "The cost function of searches in which every step costs 1."
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -145,19 +299,28 @@ class PositionSearchProblem(search.SearchProblem):
     Note: this search problem is fully specified; you should NOT change it.
     """
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True, cacheSuccessors=False):
         """
         Stores the start and goal.
 
         gameState: A GameState object (pacman.py)
         costFn: A function from a search state (tuple) to a non-negative number
         goal: A position in the gameState
+        cacheSuccessors: If True and costFn is unitCost, successors are
+          memoized by position and shared with every problem on the same
+          layout; other cost functions are never cached
         """
         self.walls = gameState.getWalls()
+        self.neighbors = gameState.data.layout.neighbors
+        self.predecessors = gameState.data.layout.predecessors
+        self.successorCache = None
+        if cacheSuccessors and costFn == unitCost:
+            self.successorCache = gameState.data.layout.getSuccessorCache('unitCost')
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
         self.costFn = costFn
+        self.unitCosts = costFn == unitCost
         self.visualize = visualize
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print 'Warning: this does not look like a regular search maze'
@@ -193,15 +356,17 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        if self.successorCache != None and state in self.successorCache:
+            # Shared with other problems, hence a tuple
+            successors = self.successorCache[state]
+        else:
+            successors = []
+            costFn = self.costFn
+            for nextState, action in self.neighbors[state]:
+                successors.append( ( nextState, action, costFn(nextState)) )
+            if self.successorCache != None:
+                successors = tuple(successors)
+                self.successorCache[state] = successors
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -211,6 +376,34 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getGoalState(self):
+        return self.goal
+
+    def packState(self, state):
+        "Packs a position into bytes, for search.externalBreadthFirstSearch."
+        return POSITION_CODEC.pack(*state)
+
+    def unpackState(self, data):
+        return POSITION_CODEC.unpack(data)
+
+    def getPredecessors(self, state):
+        """
+        Returns the states from which state can be entered, as triples of
+        (predecessor, action, stepCost), where action leads from the
+        predecessor to state.  Used by bidirectional searches, which expand
+        from the goal with this function.
+        """
+        stepCost = self.costFn(state)
+        predecessors = [(previousState, action, stepCost) for previousState, action in self.predecessors[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -273,12 +466,14 @@ class CornersProblem(search.SearchProblem):
 
     You must select a suitable state space and successor function
     """
+    unitCosts = True
 
     def __init__(self, startingGameState):
         """
         Stores the walls, pacman's starting position and corners.
         """
         self.walls = startingGameState.getWalls()
+        self.neighbors = startingGameState.data.layout.neighbors
         self.startingPosition = startingGameState.getPacmanPosition()
         top, right = self.walls.height-2, self.walls.width-2
         self.corners = ((1,1), (1,top), (right, 1), (right, top))
@@ -325,35 +520,38 @@ class CornersProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0],state[1]
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState=(nextx,nexty)
-                cost = 1
-                flag=state[2]
-
-                if len(self.corners)>32:
-                    raise Exception("Current CornersProblem implementation doesn't support more than 32 \"corner\" positions. Sorry.")
-
-                newCorners=False
-                offset=1
-                for corner in self.corners:
-                    if nextState == corner and state[2] & offset==0:
-                        flag|=offset
-                        newCorners=True
-                    offset*=2
-
-                if newCorners :
-                    successors.insert(0, ( (nextx,nexty,flag), action, cost) )
-                else:
-                    successors.append( ( (nextx,nexty,flag), action, cost) )
+        for nextState, action in self.neighbors[(state[0],state[1])]:
+            nextx, nexty = nextState
+            cost = 1
+            flag=state[2]
+
+            if len(self.corners)>32:
+                raise Exception("Current CornersProblem implementation doesn't support more than 32 \"corner\" positions. Sorry.")
+
+            newCorners=False
+            offset=1
+            for corner in self.corners:
+                if nextState == corner and state[2] & offset==0:
+                    flag|=offset
+                    newCorners=True
+                offset*=2
+
+            if newCorners :
+                successors.insert(0, ( (nextx,nexty,flag), action, cost) )
+            else:
+                successors.append( ( (nextx,nexty,flag), action, cost) )
 
-                #list.insert(0,element)
+            #list.insert(0,element)
         self._expanded += 1 # DO NOT CHANGE
         return successors
 
+    def packState(self, state):
+        "Packs a state into bytes, for search.externalBreadthFirstSearch."
+        return CORNERS_CODEC.pack(*state)
+
+    def unpackState(self, data):
+        return CORNERS_CODEC.unpack(data)
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions.  If those actions
@@ -533,6 +731,97 @@ class AStarCornersAgent(SearchAgent):
         self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
         self.searchType = CornersProblem
 
+class WaypointsProblem(search.SearchProblem):
+    """
+    A search problem which finds a path through any number of waypoints,
+    by default all the food of the layout.  It generalizes CornersProblem:
+    a state is ( pacmanPosition, visitedMask ), where bit i of the integer
+    visitedMask is set once waypoints[i] has been visited.
+
+    Searching this state space directly grows with 2 ** len(waypoints).
+    search.waypointTourSearch plans with the maze distances between the
+    waypoints instead (see getLegDistances and getLegActions).
+    """
+    unitCosts = True
+
+    def __init__(self, startingGameState, waypoints=None):
+        self.walls = startingGameState.getWalls()
+        self.layout = startingGameState.data.layout
+        self.neighbors = self.layout.neighbors
+        self.startingPosition = startingGameState.getPacmanPosition()
+        if waypoints == None:
+            waypoints = startingGameState.getFood().asList()
+        self.waypoints = list(waypoints)
+        self.waypointBits = {}
+        for i, waypoint in enumerate(self.waypoints):
+            self.waypointBits[waypoint] = self.waypointBits.get(waypoint, 0) | 1 << i
+        self.allVisited = (1 << len(self.waypoints)) - 1
+        self._expanded = 0 # DO NOT CHANGE
+
+    def getStartState(self):
+        return (self.startingPosition, self.waypointBits.get(self.startingPosition, 0))
+
+    def isGoalState(self, state):
+        return state[1] == self.allVisited
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        successors = []
+        self._expanded += 1 # DO NOT CHANGE
+        position, visited = state
+        for nextPosition, action in self.neighbors[position]:
+            successors.append( ((nextPosition, visited | self.waypointBits.get(nextPosition, 0)), action, 1) )
+        return successors
+
+    def getCostOfActions(self, actions):
+        """
+        Returns the cost of a particular sequence of actions.  If those actions
+        include an illegal move, return 999999.
+        """
+        if actions == None: return 999999
+        x,y= self.startingPosition
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            x, y = int(x + dx), int(y + dy)
+            if self.walls[x][y]: return 999999
+        return len(actions)
+
+    def getLegDistances(self):
+        """
+        Returns the matrix of maze distances between the legs' end points:
+        point 0 is the start and point i the waypoint i - 1.  Unreachable
+        points are None.  The distances are read from the all-pairs table
+        of the layout (see mazeDistances.py).
+        """
+        points = [self.startingPosition] + self.waypoints
+        table = mazeDistances.getMazeDistances(self.layout)
+        return [[table.getDistance(point, other) for other in points] for point in points]
+
+    def getLegActions(self, i, j):
+        """
+        Returns the actions of a shortest path from point i to point j of
+        getLegDistances, always stepping to a neighbor one step closer.
+        """
+        points = [self.startingPosition] + self.waypoints
+        table = mazeDistances.getMazeDistances(self.layout)
+        position, goal = points[i], points[j]
+        distance = table.getDistance(position, goal)
+        actions = []
+        while distance > 0:
+            for nextPosition, action in self.neighbors[position]:
+                if table.getDistance(nextPosition, goal) == distance - 1:
+                    break
+            actions.append(action)
+            position = nextPosition
+            distance -= 1
+        return actions
+
+class WaypointsAgent(SearchAgent):
+    "A SearchAgent which plans a tour of all the food with search.waypointTourSearch"
+    def __init__(self):
+        self.searchFunction = search.waypointTourSearch
+        self.searchType = WaypointsProblem
+
 class FoodSearchProblem:
     """
     A search problem associated with finding the a path that collects all of the
@@ -541,10 +830,15 @@ class FoodSearchProblem:
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
       foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+
+    The food is kept in a BitGrid, so copying it for every successor and
+    hashing it for the closed set do not touch every cell.
     """
+    unitCosts = True
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        self.start = (startingGameState.getPacmanPosition(), BitGrid.fromGrid(startingGameState.getFood()))
         self.walls = startingGameState.getWalls()
+        self.neighbors = startingGameState.data.layout.neighbors
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
@@ -559,14 +853,10 @@ class FoodSearchProblem:
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+        for (nextx, nexty), direction in self.neighbors[state[0]]:
+            nextFood = state[1].copy()
+            nextFood[nextx][nexty] = False
+            successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
         return successors
 
     def getCostOfActions(self, actions):
@@ -583,11 +873,98 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+    def getFoodGrid(self, state):
+        "Returns the remaining food of a search state as a Grid."
+        return state[1]
+
+    def encodeState(self, state):
+        "Returns a picklable ( pacmanPosition, foodBits ) tuple for the state."
+        return (state[0], state[1].bits)
+
+    def decodeState(self, code):
+        "Rebuilds a search state from encodeState."
+        food = BitGrid(self.walls.width, self.walls.height)
+        food.bits = code[1]
+        return (code[0], food)
+
+    def packState(self, state):
+        "Packs a state into bytes, for search.externalBreadthFirstSearch."
+        position, foodBits = self.encodeState(state)
+        return POSITION_CODEC.pack(*position) + packBits(foodBits, self.walls.width * self.walls.height)
+
+    def unpackState(self, data):
+        return self.decodeState((POSITION_CODEC.unpack_from(data), unpackBits(data[POSITION_CODEC.size:])))
+
+class CompactFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem whose states are tuples ( pacmanPosition, foodMask ).
+
+    The food of the starting state is numbered once; bit i of the integer
+    foodMask is set while food number i (at foodPositions[i]) has not been
+    eaten.  Successors therefore share no mutable data and hashing a state
+    costs the same as hashing two integers and a position.
+
+    Heuristics written for FoodSearchProblem keep working through
+    getFoodGrid(state), which builds the Grid view only when it is asked for.
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        position, food = self.start
+        self.foodPositions = food.asList()
+        self.foodIndex = dict([(foodPosition, 1 << i) for i, foodPosition in enumerate(self.foodPositions)])
+        self.start = (position, (1 << len(self.foodPositions)) - 1)
+        self._gridBits = [1 << (x * food.height + y) for x, y in self.foodPositions]
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        successors = []
+        self._expanded += 1 # DO NOT CHANGE
+        position, foodMask = state
+        foodIndex = self.foodIndex
+        for nextPosition, direction in self.neighbors[position]:
+            successors.append( ((nextPosition, foodMask & ~foodIndex.get(nextPosition, 0)), direction, 1) )
+        return successors
+
+    def getFoodGrid(self, state):
+        "Returns the remaining food of a search state as a BitGrid."
+        foodMask = state[1]
+        bits = 0
+        i = 0
+        while foodMask:
+            if foodMask & 1:
+                bits |= self._gridBits[i]
+            foodMask >>= 1
+            i += 1
+        grid = BitGrid(self.walls.width, self.walls.height)
+        grid.bits = bits
+        return grid
+
+    def encodeState(self, state):
+        return state
+
+    def decodeState(self, code):
+        return code
+
+    def packState(self, state):
+        "Packs a state into bytes, for search.externalBreadthFirstSearch."
+        return POSITION_CODEC.pack(*state[0]) + packBits(state[1], len(self.foodPositions))
+
+    def unpackState(self, data):
+        return (POSITION_CODEC.unpack_from(data), unpackBits(data[POSITION_CODEC.size:]))
+
+    def getFoodPositions(self, state):
+        "Returns the positions of the remaining food of a search state."
+        foodMask = state[1]
+        return [self.foodPositions[i] for i in range(len(self.foodPositions)) if foodMask >> i & 1]
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
-        self.searchType = FoodSearchProblem
+        self.searchType = CompactFoodSearchProblem
 
 def foodHeuristic(state, problem):
     """
@@ -618,6 +995,7 @@ def foodHeuristic(state, problem):
     problem.heuristicInfo['wallCount']
     """
 
+    state = (state[0], problem.getFoodGrid(state))
     return strategyThree(state,problem)
     #return strategyTwo(state,problem)
 
@@ -755,6 +1133,136 @@ def strategyOne(state, problem):
     nextTarger=minDistPoint(position,foodGrid.asList())
     return util.manhattanDistance(position,nextTarger)
 
+def foodMazeHeuristic(state, problem):
+    """
+    The maze distance to the farthest remaining food, read from the
+    all-pairs distance table of the layout.  Admissible and consistent.
+    """
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = mazeDistances.getMazeDistances(problem.startingGameState.data.layout)
+    distances = problem.heuristicInfo['mazeDistances']
+    position = state[0]
+    heuristic = 0
+    for food in problem.getFoodGrid(state).asList():
+        distance = distances.getDistance(position, food)
+        if distance > heuristic:
+            heuristic = distance
+    return heuristic
+
+# The number of food sets whose spanning trees foodMSTHeuristic remembers
+FOOD_MST_CACHE_SIZE = 10000
+
+def foodMSTHeuristic(state, problem):
+    """
+    The maze distance to the closest remaining food plus the weight of a
+    minimum spanning tree of the remaining food under maze distances.  A
+    path which eats all the food reaches one of them first and then
+    connects the rest, so it is never shorter.  Admissible and consistent.
+
+    Trees are memoized in problem.heuristicInfo by the bitmask of the
+    remaining food, in a util.LRUCache of FOOD_MST_CACHE_SIZE entries.  If
+    pacman has just eaten a dot which was a leaf of the tree of the food
+    before, the new tree is that tree without the leaf, so no spanning tree
+    is built.
+    """
+    info = problem.heuristicInfo
+    if 'foodMSTs' not in info:
+        initFoodMSTs(problem)
+    foodIds = info['foodIds']
+    foodMask = state[1]
+    if not isinstance(foodMask, (int, long)):
+        foodMask = 0
+        for food in problem.getFoodGrid(state).asList():
+            foodMask |= 1 << foodIds[food]
+    if foodMask == 0:
+        return 0
+
+    trees = info['foodMSTs']
+    foodDistances = info['foodDistances']
+    tree = trees.get(foodMask)
+    if tree == None:
+        eaten = foodIds.get(state[0])
+        if eaten != None and not foodMask >> eaten & 1:
+            previous = trees.peek(foodMask | 1 << eaten)
+            if previous != None:
+                tree = removeFoodLeaf(previous, eaten, foodDistances)
+                if tree != None:
+                    info['foodMSTsDerived'] += 1
+        if tree == None:
+            tree = foodSpanningTree(foodMask, foodDistances)
+        trees.put(foodMask, tree)
+
+    weight, adjacency = tree
+    position = state[0]
+    distancesFromFood = info['distancesFromFood']
+    closest = min([distancesFromFood[food].get(position, 0) for food in adjacency])
+    return closest + weight
+
+def initFoodMSTs(problem):
+    """
+    Numbers the food of the start state and stores the maze distances
+    between them and from them to every cell in problem.heuristicInfo.
+    """
+    info = problem.heuristicInfo
+    distances = mazeDistances.getMazeDistances(problem.startingGameState.data.layout)
+    foodPositions = problem.getFoodGrid(problem.getStartState()).asList()
+    distancesFromFood = [distances.getDistancesFrom(food) for food in foodPositions]
+    info['foodIds'] = dict([(food, i) for i, food in enumerate(foodPositions)])
+    info['distancesFromFood'] = distancesFromFood
+    info['foodDistances'] = [[row.get(other, 0) for other in foodPositions] for row in distancesFromFood]
+    info['foodMSTs'] = util.LRUCache(FOOD_MST_CACHE_SIZE)
+    info['foodMSTsDerived'] = 0
+
+def foodSpanningTree(foodMask, foodDistances):
+    """
+    Prim's algorithm over the food whose bits are set in foodMask.  Returns
+    (weight, adjacency), where adjacency maps each food number to the list
+    of its neighbours in the tree.
+    """
+    foods = []
+    i = 0
+    while foodMask:
+        if foodMask & 1:
+            foods.append(i)
+        foodMask >>= 1
+        i += 1
+    root = foods[0]
+    adjacency = {root: []}
+    rootDistances = foodDistances[root]
+    best = dict([(food, (rootDistances[food], root)) for food in foods[1:]])
+    weight = 0
+    while best:
+        food = min(best, key=best.get)
+        distance, parent = best.pop(food)
+        weight += distance
+        adjacency[food] = [parent]
+        adjacency[parent].append(food)
+        row = foodDistances[food]
+        for other, (otherDistance, otherParent) in best.items():
+            if row[other] < otherDistance:
+                best[other] = (row[other], food)
+    return weight, adjacency
+
+def removeFoodLeaf(tree, food, foodDistances):
+    """
+    Returns the minimum spanning tree without food if it is a leaf of tree,
+    otherwise None.  Every edge outside a minimum spanning tree is the
+    longest on the cycle it closes, and no such cycle passes through a
+    leaf, so what is left is still a minimum spanning tree.  The cached
+    tree is not changed.
+    """
+    weight, adjacency = tree
+    neighbors = adjacency[food]
+    if len(neighbors) > 1:
+        return None
+    adjacency = dict(adjacency)
+    del adjacency[food]
+    if neighbors:
+        neighbor = neighbors[0]
+        adjacency[neighbor] = [other for other in adjacency[neighbor] if other != food]
+        weight -= foodDistances[food][neighbor]
+    return weight, adjacency
+
 def closestPoint(fromPoint, candidateList):
     if len(candidateList)==0:
         return None
@@ -858,12 +1366,48 @@ def listPermutations(lst):
 
 #----------------------------------------------------------------------------
 class ClosestDotSearchAgent(SearchAgent):
-    "Search for all food using a sequence of searches"
+    """
+    Search for all food using a sequence of searches
+
+    The searches walk down a mazeDistances.GoalDistanceField of the
+    remaining food, which is built once and repaired after every eaten dot
+    instead of searching the maze again.  segmentTimes holds the seconds
+    each segment took to find and to repair the field after it.
+    """
+
+    # The breadth first searches of searchPathToClosestDot, which run when
+    # there is no distance field, share successor tuples through the layout
+    cacheSuccessors = True
+
+    # Only set while registerInitialState eats the food it was built for
+    distanceField = None
+
     def registerInitialState(self, state):
         self.actions = []
+        self.segmentTimes = []
         currentState = state
+        self.distanceField = mazeDistances.GoalDistanceField(state.data.layout.neighbors, state.getFood().asList())
+        try:
+            self.eatAllFood(currentState)
+        finally:
+            self.distanceField = None
+        self.actionIndex = 0
+        print 'Path found with cost %d.' % len(self.actions)
+        if self.segmentTimes:
+            findTimes = [times[0] for times in self.segmentTimes]
+            repairTimes = [times[1] for times in self.segmentTimes]
+            print('Segments: %d, find %.3f ms on average (%.3f ms at most), repair %.3f ms on average (%.3f ms at most)' %
+                  (len(self.segmentTimes), 1000 * sum(findTimes) / len(findTimes), 1000 * max(findTimes),
+                   1000 * sum(repairTimes) / len(repairTimes), 1000 * max(repairTimes)))
+
+    def eatAllFood(self, currentState):
+        "Appends the segments to every dot to actions, repairing the distance field after each."
         while(currentState.getFood().count() > 0):
+            startTime = time.time()
             nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+            findTime = time.time() - startTime
+            if not nextPathSegment:
+                raise Exception, 'findPathToClosestDot found no reachable dot!\n%s' % str(currentState)
             self.actions += nextPathSegment
             for action in nextPathSegment:
                 legal = currentState.getLegalActions()
@@ -871,19 +1415,23 @@ class ClosestDotSearchAgent(SearchAgent):
                     t = (str(action), str(currentState))
                     raise Exception, 'findPathToClosestDot returned an illegal move: %s!\n%s' % t
                 currentState = currentState.generateSuccessor(0, action)
-        self.actionIndex = 0
-        print 'Path found with cost %d.' % len(self.actions)
+            startTime = time.time()
+            self.distanceField.removeGoal(currentState.getPacmanPosition())
+            self.segmentTimes.append((findTime, time.time() - startTime))
 
     def findPathToClosestDot(self, gameState):
         """
         Returns a path (a list of actions) to the closest dot, starting from
-        gameState.
+        gameState.  Outside registerInitialState there is no distance field
+        of the food, so a single breadth first search is cheaper.
         """
-        # Here are some useful elements of the startState
-        startPosition = gameState.getPacmanPosition()
-        food = gameState.getFood()
-        walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
+        if self.distanceField == None:
+            return self.searchPathToClosestDot(gameState)
+        return self.distanceField.descend(gameState.getPacmanPosition())
+
+    def searchPathToClosestDot(self, gameState):
+        "Finds the path with a breadth first search of the AnyFoodSearchProblem."
+        problem = AnyFoodSearchProblem(gameState, self.cacheSuccessors)
         return search.breadthFirstSearch(problem)
 
 class AnyFoodSearchProblem(PositionSearchProblem):
@@ -901,15 +1449,20 @@ class AnyFoodSearchProblem(PositionSearchProblem):
     method.
     """
 
-    def __init__(self, gameState):
+    def __init__(self, gameState, cacheSuccessors=False):
         "Stores information from the gameState.  You don't need to change this."
         # Store the food for later reference
         self.food = gameState.getFood()
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.neighbors = gameState.data.layout.neighbors
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
+        self.unitCosts = True
+        self.successorCache = None
+        if cacheSuccessors:
+            self.successorCache = gameState.data.layout.getSuccessorCache('unitCost')
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state):
@@ -930,11 +1483,17 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+
+    The distances come from the all-pairs table of the layout (see
+    mazeDistances.py), so after the first call every query takes constant time.
+    As with a breadth-first search, points which are not connected are 0 apart.
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    distance = mazeDistances.getMazeDistances(gameState.data.layout).getDistance(point1, point2)
+    if distance == None:
+        return 0
+    return distance
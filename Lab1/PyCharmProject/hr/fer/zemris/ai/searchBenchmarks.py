@@ -0,0 +1,677 @@
+# searchBenchmarks.py
+# -------------------
+# Headless timing runs for the search code in search.py and searchAgents.py.
+# Nothing here is drawn on screen, so the numbers only measure the search
+# itself.  Run a single benchmark with
+#
+# > python searchBenchmarks.py -b backtrack
+#
+# or all of them with
+#
+# > python searchBenchmarks.py
+
+
+import multiprocessing
+import optparse
+import shutil
+import tempfile
+import time
+
+import eightpuzzle
+import game
+import layout
+import mazeDistances
+import pacman
+import patternDatabases
+import search
+import searchAgents
+import util
+
+
+def loadGameState(layoutName):
+    "Builds the starting GameState of a layout from the layouts/ folder."
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception("The layout " + layoutName + " cannot be found")
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    return gameState
+
+def timeCall(function, *args, **keyArgs):
+    "Calls the function and returns its result together with the elapsed seconds."
+    startTime = time.time()
+    result = function(*args, **keyArgs)
+    return result, time.time() - startTime
+
+def printRow(name, seconds, extra=''):
+    print '%-48s %10.4f s  %s' % (name, seconds, extra)
+
+def buildNodeChain(problem, actions):
+    """
+    Replays the actions from the start state of the problem and returns the
+    last SearchNode of the resulting parent chain, just like the one a search
+    would hold when it reaches the goal.
+    """
+    node = search.SearchNode(problem.getStartState())
+    for action in actions:
+        for successor, succAction, stepCost in problem.getSuccessors(node.position):
+            if succAction == action:
+                node = search.SearchNode(successor, node, action, node.cost + stepCost)
+                break
+        else:
+            raise Exception('Illegal action %s in the replayed path' % action)
+    return node
+
+def copyingBacktrack(node):
+    """
+    The previous SearchNode.backtrack: deep copies the node (and with it the
+    whole ancestry) on every level of the recursion.
+    """
+    import copy
+    node = copy.deepcopy(node)
+    if node.isRootNode():
+        return []
+    moves = copyingBacktrack(node.parent)
+    moves.append(node.transition)
+    return moves
+
+def benchmarkBacktrack():
+    """
+    Path reconstruction on the longest paths of the project: the bigMaze
+    solution and a full ClosestDot tour of bigSearch replayed as a
+    FoodSearchProblem (so every node carries a food Grid).
+    """
+    import sys
+    print 'Path reconstruction (SearchNode.backtrack)'
+
+    gameState = loadGameState('bigMaze')
+    problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+    actions = search.breadthFirstSearch(problem)
+    chains = [('bigMaze', problem, actions)]
+
+    gameState = loadGameState('bigSearch')
+    agent = searchAgents.ClosestDotSearchAgent()
+    agent.registerInitialState(gameState)
+    problem = searchAgents.FoodSearchProblem(gameState)
+    chains.append(('bigSearch', problem, agent.actions))
+
+    for name, problem, actions in chains:
+        goalNode = buildNodeChain(problem, actions)
+        moves, seconds = timeCall(goalNode.backtrack)
+        assert moves == actions
+        printRow('%s iterative (%d moves)' % (name, len(actions)), seconds)
+
+        oldLimit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(oldLimit, 100 * len(actions)))
+        try:
+            moves, seconds = timeCall(copyingBacktrack, goalNode)
+            printRow('%s copying (%d moves)' % (name, len(actions)), seconds)
+        except RuntimeError:
+            printRow('%s copying (%d moves)' % (name, len(actions)), 0, 'recursion limit exceeded')
+        finally:
+            sys.setrecursionlimit(oldLimit)
+
+class ListQueue:
+    "The previous util.Queue, which inserts at the front of a list."
+    def __init__(self):
+        self.list = []
+
+    def push(self, item):
+        self.list.insert(0, item)
+
+    def pop(self):
+        return self.list.pop()
+
+    def isEmpty(self):
+        return len(self.list) == 0
+
+def fillAndDrain(frontier, size):
+    "Pushes size items onto the frontier and pops them all again."
+    for i in xrange(size):
+        frontier.push(i)
+    while not frontier.isEmpty():
+        frontier.pop()
+
+def benchmarkFrontiers(size=1000000):
+    """
+    Push and pop of a million items through every frontier in util.  The old
+    list-backed queue is quadratic, so it only gets a tenth of the items.
+    """
+    print 'Frontier push/pop (%d items)' % size
+    frontiers = [('util.Stack', util.Stack(), size),
+                 ('util.Queue', util.Queue(), size),
+                 ('util.PriorityQueueWithFunction', util.PriorityQueueWithFunction(lambda item: -item), size),
+                 ('list-backed queue', ListQueue(), size / 10)]
+    for name, frontier, items in frontiers:
+        result, seconds = timeCall(fillAndDrain, frontier, items)
+        printRow('%s (%d items)' % (name, items), seconds)
+
+def benchmarkIndexed():
+    """
+    aStarSearch (lazy deletion of duplicates) against indexedAStarSearch
+    (decrease-key) on a maze, a corners and a food problem.
+    """
+    print 'Duplicate handling in A* (lazy deletion vs. decrease-key)'
+    runs = [('bigMaze', lambda state: searchAgents.PositionSearchProblem(state, warn=False, visualize=False),
+             searchAgents.manhattanHeuristic),
+            ('mediumCorners', searchAgents.CornersProblem, searchAgents.cornersHeuristic),
+            ('trickySearch', searchAgents.FoodSearchProblem, searchAgents.foodHeuristic)]
+    for layoutName, problemType, heuristic in runs:
+        gameState = loadGameState(layoutName)
+        for function in [search.aStarSearch, search.indexedAStarSearch]:
+            problem = problemType(gameState)
+            actions, seconds = timeCall(function, problem, heuristic)
+            printRow('%s %s' % (layoutName, function.__name__), seconds,
+                     'cost %d, expanded %d' % (problem.getCostOfActions(actions), problem._expanded))
+
+def benchmarkBuckets():
+    """
+    A* with the heap frontier against the bucket frontier, with insertion
+    order and with preferDeeper tie-breaking inside a bucket.
+    """
+    print 'A* frontier (heap vs. buckets)'
+    runs = [('bigMaze', lambda state: searchAgents.PositionSearchProblem(state, warn=False, visualize=False),
+             searchAgents.manhattanHeuristic),
+            ('openMaze', lambda state: searchAgents.PositionSearchProblem(state, warn=False, visualize=False),
+             searchAgents.manhattanHeuristic),
+            ('mediumCorners', searchAgents.CornersProblem, searchAgents.cornersHeuristic),
+            ('trickySearch', searchAgents.FoodSearchProblem, searchAgents.foodHeuristic)]
+    f = lambda node: node.cost + node.heuristic
+    frontiers = [('heap', lambda: util.PriorityQueueWithFunction(f)),
+                 ('buckets', lambda: util.BucketPriorityQueueWithFunction(f)),
+                 ('buckets+preferDeeper', lambda: util.BucketPriorityQueueWithFunction(f, search.preferDeeper))]
+    for layoutName, problemType, heuristic in runs:
+        gameState = loadGameState(layoutName)
+        for name, frontier in frontiers:
+            problem = problemType(gameState)
+            actions, seconds = timeCall(search.genericSearchAlt, problem, frontier(), heuristic)
+            printRow('%s %s' % (layoutName, name), seconds,
+                     'cost %d, expanded %d' % (problem.getCostOfActions(actions), problem._expanded))
+
+def benchmarkGrids(repeats=10000):
+    "The Grid operations used by FoodSearchProblem, on the bigSearch food."
+    print 'Grid against BitGrid on the bigSearch food (%d calls each)' % repeats
+    food = loadGameState('bigSearch').getFood()
+    grids = [('Grid', food), ('BitGrid', game.BitGrid.fromGrid(food))]
+    operations = [('copy', lambda grid: grid.copy()),
+                  ('copy+hash', lambda grid: hash(grid.copy())),
+                  ('count', lambda grid: grid.count()),
+                  ('asList', lambda grid: grid.asList()),
+                  ('packBits', lambda grid: grid.packBits())]
+    for operationName, operation in operations:
+        for gridName, grid in grids:
+            result, seconds = timeCall(lambda: [operation(grid) for i in xrange(repeats)])
+            printRow('%s %s' % (gridName, operationName), seconds)
+
+def approximateSize(value, seen=None):
+    """
+    Approximate number of bytes held by a search state: sys.getsizeof summed
+    over the tuples, lists, dicts and instances it is made of.  Objects shared
+    with the layout (such as the walls) are counted too, so compare the
+    numbers with each other rather than taking them as exact.
+    """
+    import sys
+    if seen == None: seen = set()
+    if id(value) in seen: return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum([approximateSize(element, seen) for element in value])
+    elif isinstance(value, dict):
+        size += sum([approximateSize(k, seen) + approximateSize(v, seen) for k, v in value.items()])
+    elif hasattr(value, '__dict__'):
+        size += approximateSize(value.__dict__, seen)
+    return size
+
+def benchmarkExternal(bufferSize=10000):
+    """
+    In-memory breadth first search against the disk-based
+    externalBreadthFirstSearch, whose buffer holds bufferSize states.
+    """
+    print 'External-memory breadth first search (bufferSize=%d)' % bufferSize
+    problems = [('trickySearch', searchAgents.CompactFoodSearchProblem(loadGameState('trickySearch'))),
+                ('mediumCorners', searchAgents.CornersProblem(loadGameState('mediumCorners'))),
+                ('eight puzzle', eightpuzzle.CountingEightPuzzleSearchProblem(
+                    eightpuzzle.CompactEightPuzzleState([8, 6, 7, 2, 5, 4, 3, 0, 1])))]
+    for name, problem in problems:
+        for label, searchFunction, keyArgs in [('bfs', search.breadthFirstSearch, {}),
+                                               ('ebfs', search.externalBreadthFirstSearch, {'bufferSize': bufferSize}),
+                                               ('ebfs undirected', search.externalBreadthFirstSearch,
+                                                {'bufferSize': bufferSize, 'undirected': True})]:
+            problem._expanded = 0
+            actions, seconds = timeCall(searchFunction, problem, **keyArgs)
+            printRow('%s %s' % (name, label), seconds, 'cost %d, %d expanded' %
+                     (problem.getCostOfActions(actions), problem._expanded))
+
+def benchmarkFoodStates():
+    """
+    FoodSearchProblem with the list-backed Grid, with the BitGrid and the
+    CompactFoodSearchProblem (position, food bitmask) states on trickySearch.
+    """
+    print 'Food search states on trickySearch'
+    gameState = loadGameState('trickySearch')
+
+    def listGridProblem(state):
+        problem = searchAgents.FoodSearchProblem(state)
+        problem.start = (problem.start[0], problem.start[1].toGrid())
+        return problem
+
+    problemTypes = [('Grid', listGridProblem),
+                    ('BitGrid', searchAgents.FoodSearchProblem),
+                    ('compact', searchAgents.CompactFoodSearchProblem)]
+    for name, problemType in problemTypes:
+        problem = problemType(gameState)
+        print '%-48s %10d bytes' % ('%s start state' % name, approximateSize(problem.getStartState()))
+        for function, heuristic in [(search.breadthFirstSearch, None), (search.aStarSearch, searchAgents.foodHeuristic)]:
+            problem = problemType(gameState)
+            if heuristic == None:
+                actions, seconds = timeCall(function, problem)
+            else:
+                actions, seconds = timeCall(function, problem, heuristic)
+            printRow('%s %s' % (name, function.__name__), seconds,
+                     'cost %d, expanded %d' % (problem.getCostOfActions(actions), problem._expanded))
+
+def benchmarkLazy():
+    """
+    Heuristic evaluations of eager and lazy A*, and expansions of breadth
+    first search with the goal tested on popping and on generation.
+    """
+    print 'Lazy heuristics and early goal tests'
+    cases = [('trickySearch', searchAgents.CompactFoodSearchProblem,
+              [searchAgents.foodHeuristic, searchAgents.foodMazeHeuristic]),
+             ('mediumCorners', searchAgents.CornersProblem, [searchAgents.cornersHeuristic])]
+    for layoutName, problemType, heuristics in cases:
+        gameState = loadGameState(layoutName)
+        searches = [('bfs', search.breadthFirstSearch, {}),
+                    ('egbfs', search.earlyGoalBreadthFirstSearch, {})]
+        for heuristic in heuristics:
+            searches.append(('astar %s' % heuristic.__name__, search.aStarSearch, {'heuristic': heuristic}))
+            searches.append(('lazyastar %s' % heuristic.__name__, search.lazyAStarSearch, {'heuristic': heuristic}))
+        for name, searchFunction, keyArgs in searches:
+            problem = problemType(gameState)
+            stats = search.SearchStats()
+            actions, seconds = timeCall(searchFunction, problem, stats=stats, **keyArgs)
+            printRow('%s %s' % (layoutName, name), seconds, 'cost %d, %d expanded, %d heuristic calls' %
+                     (problem.getCostOfActions(actions), problem._expanded, stats.heuristicEvaluations))
+
+def benchmarkMazeDistances(queries=1000):
+    """
+    Maze distance queries answered by a fresh BFS each (the previous
+    mazeDistance) and by the all-pairs table, built without and with the
+    disk cache.
+    """
+    import random
+    print 'Maze distances on bigMaze (%d queries)' % queries
+    gameState = loadGameState('bigMaze')
+    layout = gameState.data.layout
+    cells = layout.cellPositions
+    random.seed(0)
+    pairs = [(random.choice(cells), random.choice(cells)) for i in range(queries)]
+
+    def bfsDistances():
+        distances = []
+        for start, goal in pairs:
+            problem = searchAgents.PositionSearchProblem(gameState, start=start, goal=goal, warn=False, visualize=False)
+            distances.append(len(search.bfs(problem)))
+        return distances
+    expected, seconds = timeCall(bfsDistances)
+    printRow('BFS per query', seconds)
+
+    table, seconds = timeCall(mazeDistances.MazeDistances, layout)
+    printRow('table built', seconds, '%d cells' % table.cellCount)
+    cacheDirectory = tempfile.mkdtemp()
+    try:
+        mazeDistances.MazeDistances(layout, cacheDirectory)
+        table, seconds = timeCall(mazeDistances.MazeDistances, layout, cacheDirectory)
+        printRow('table memory-mapped from the cache', seconds)
+    finally:
+        shutil.rmtree(cacheDirectory)
+    distances, seconds = timeCall(lambda: [table.getDistance(start, goal) for start, goal in pairs])
+    assert distances == expected
+    printRow('table queries', seconds)
+
+class DirectionLoopPositionSearchProblem(searchAgents.PositionSearchProblem):
+    "PositionSearchProblem with the previous successor function, which re-reads the walls."
+    def getSuccessors(self, state):
+        successors = []
+        for action in [game.Directions.NORTH, game.Directions.SOUTH, game.Directions.EAST, game.Directions.WEST]:
+            x,y = state
+            dx, dy = game.Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                nextState = (nextx, nexty)
+                cost = self.costFn(nextState)
+                successors.append( ( nextState, action, cost) )
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+        return successors
+
+def benchmarkAdjacency(repeats=20):
+    """
+    Expansions per second of BFS on bigMaze with successors generated by
+    looping over the directions and from the layout adjacency.
+    """
+    print 'Successor generation on bigMaze (BFS, %d runs)' % repeats
+    gameState = loadGameState('bigMaze')
+    problemTypes = [('direction loop', DirectionLoopPositionSearchProblem),
+                    ('layout adjacency', searchAgents.PositionSearchProblem)]
+    for name, problemType in problemTypes:
+        expanded = 0
+        seconds = 0
+        for i in range(repeats):
+            problem = problemType(gameState, warn=False, visualize=False)
+            actions, elapsed = timeCall(search.breadthFirstSearch, problem)
+            expanded += problem._expanded
+            seconds += elapsed
+        printRow(name, seconds, '%d expansions/s' % (expanded / seconds))
+
+def benchmarkWaypoints(sizes=(8, 12, 16)):
+    """
+    Tours of all the food planned by search.waypointTourSearch, and the
+    exact Held-Karp order against 2-opt/Or-opt on random subsets of the
+    bigSearch food.
+    """
+    print 'Waypoint tours of all the food'
+    for layoutName in ['trickySearch', 'mediumSearch', 'bigSearch']:
+        gameState = loadGameState(layoutName)
+        problem = searchAgents.WaypointsProblem(gameState)
+        actions, seconds = timeCall(search.waypointTourSearch, problem)
+        printRow('%s (%d waypoints)' % (layoutName, len(problem.waypoints)), seconds,
+                 'cost %d' % problem.getCostOfActions(actions))
+
+    import random
+    random.seed(0)
+    distances = searchAgents.WaypointsProblem(loadGameState('bigSearch')).getLegDistances()
+    for size in sizes:
+        points = [0] + random.sample(range(1, len(distances)), size)
+        subset = [[distances[i][j] for j in points] for i in points]
+        order, seconds = timeCall(search.heldKarpOrder, subset)
+        printRow('held-karp %d waypoints' % size, seconds, 'length %d' % search.orderLength(subset, order))
+        order, seconds = timeCall(search.improveOrder, subset, search.nearestNeighborOrder(subset))
+        printRow('2-opt/or-opt %d waypoints' % size, seconds, 'length %d' % search.orderLength(subset, order))
+
+def benchmarkFoodMST(layoutName='trickySearch'):
+    """
+    A* on a food layout with foodHeuristic (a greedy chain of Manhattan
+    distances), the distance to the farthest food and the minimum spanning
+    tree of the food, with the hits and misses of the spanning tree cache.
+    """
+    print 'Food heuristics on %s (A*)' % layoutName
+    gameState = loadGameState(layoutName)
+    for heuristic in [searchAgents.foodHeuristic, searchAgents.foodMazeHeuristic, searchAgents.foodMSTHeuristic]:
+        problem = searchAgents.CompactFoodSearchProblem(gameState)
+        actions, seconds = timeCall(search.aStarSearch, problem, heuristic)
+        note = 'cost %d, expanded %d' % (problem.getCostOfActions(actions), problem._expanded)
+        if 'foodMSTs' in problem.heuristicInfo:
+            trees = problem.heuristicInfo['foodMSTs']
+            note += ', trees %d hits, %d misses, %d derived' % (trees.hits, trees.misses,
+                                                                problem.heuristicInfo['foodMSTsDerived'])
+        printRow(heuristic.__name__, seconds, note)
+
+def benchmarkSuccessorCache(repeats=20):
+    """
+    A breadth first search to the closest dot for every dot of bigSearch,
+    as ClosestDotSearchAgent.searchPathToClosestDot runs them, without and
+    with the successor cache shared per layout.  Only the searches are timed.
+    """
+    print 'Closest dot searches on bigSearch (successor cache, %d runs)' % repeats
+    for cacheSuccessors in [False, True]:
+        gameState = loadGameState('bigSearch')
+        agent = searchAgents.ClosestDotSearchAgent()
+        agent.cacheSuccessors = cacheSuccessors
+        seconds = 0
+        for i in range(repeats):
+            currentState, cost, searches = gameState, 0, 0
+            while currentState.getFood().count() > 0:
+                path, elapsed = timeCall(agent.searchPathToClosestDot, currentState)
+                seconds += elapsed
+                cost += len(path)
+                searches += 1
+                for action in path:
+                    currentState = currentState.generateSuccessor(0, action)
+        printRow('cacheSuccessors=%s' % cacheSuccessors, seconds, 'cost %d, %d searches' % (cost, searches))
+
+def benchmarkStats(repeats=20):
+    "Overhead of collecting search.SearchStats during A* on bigMaze."
+    print 'Search statistics overhead on bigMaze (A*, %d runs)' % repeats
+    gameState = loadGameState('bigMaze')
+    heuristic = searchAgents.manhattanHeuristic
+    for collect in [False, True]:
+        seconds = 0
+        for i in range(repeats):
+            problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+            stats = None
+            if collect:
+                stats = search.SearchStats()
+            actions, elapsed = timeCall(search.aStarSearch, problem, heuristic, stats=stats)
+            seconds += elapsed
+        printRow('stats %s' % (collect and 'enabled' or 'disabled'), seconds)
+
+def benchmarkBidirectional(puzzles=3, checkedPuzzles=50):
+    """
+    Expansions of forward and bidirectional searches on bigMaze and on
+    random eight puzzles, which branch far more than the maze corridors.
+    The plans of biastar are then checked against the eight puzzle
+    distance table.
+    """
+    print 'Forward and bidirectional search on bigMaze'
+    gameState = loadGameState('bigMaze')
+    searches = [('ucs', search.uniformCostSearch, {}),
+                ('astar manhattan', search.aStarSearch, {'heuristic': searchAgents.manhattanHeuristic}),
+                ('bibfs', search.bidirectionalBreadthFirstSearch, {}),
+                ('biucs', search.bidirectionalUniformCostSearch, {}),
+                ('biastar manhattan', search.bidirectionalAStarSearch,
+                 {'heuristic': searchAgents.manhattanHeuristic, 'backwardHeuristic': searchAgents.manhattanHeuristic})]
+    for name, searchFunction, keyArgs in searches:
+        problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+        actions, seconds = timeCall(searchFunction, problem, **keyArgs)
+        printRow(name, seconds, 'cost %d, %d expanded' % (problem.getCostOfActions(actions), problem._expanded))
+
+    import random
+    random.seed(0)
+    # The pattern databases only estimate the moves to the solved puzzle, so
+    # the backward search of biastar keeps the nullHeuristic
+    pdbAStar = lambda problem: search.bidirectionalAStarSearch(problem, eightpuzzle.additivePDBHeuristic)
+    for i in range(puzzles):
+        puzzle = eightpuzzle.createRandomEightPuzzle(200)
+        print 'Eight puzzle %d' % i
+        for name, searchFunction in [('bfs', search.breadthFirstSearch),
+                                     ('bibfs', search.bidirectionalBreadthFirstSearch),
+                                     ('biucs', search.bidirectionalUniformCostSearch),
+                                     ('biastar pdb', pdbAStar)]:
+            problem = eightpuzzle.CountingEightPuzzleSearchProblem(puzzle)
+            actions, seconds = timeCall(searchFunction, problem)
+            printRow(name, seconds, '%d moves, %d expanded' % (len(actions), problem._expanded))
+
+    checked = [eightpuzzle.createRandomEightPuzzle(200) for i in range(checkedPuzzles)]
+    mistakes, seconds = timeCall(eightpuzzle.checkPlanCosts, pdbAStar, checked)
+    printRow('biastar pdb plans checked', seconds, '%d of %d optimal' % (checkedPuzzles - len(mistakes), checkedPuzzles))
+    if mistakes:
+        raise Exception, 'biastar returned plans which are not optimal: %s' % \
+            ', '.join(['%d moves for %d' % (moves, distance) for puzzle, moves, distance in mistakes])
+
+def benchmarkMemoryBounded():
+    """
+    A*, IDA* and SMA* with a few memory limits on trickySearch.  For A* the
+    nodes held are the peak frontier and closed set sizes; IDA* only holds
+    the current path and its transposition table.
+    """
+    print 'Memory-bounded search on trickySearch (foodMazeHeuristic)'
+    gameState = loadGameState('trickySearch')
+    heuristic = searchAgents.foodMazeHeuristic
+    problem = searchAgents.FoodSearchProblem(gameState)
+    stats = search.SearchStats()
+    actions, seconds = timeCall(search.aStarSearch, problem, heuristic, stats=stats)
+    printRow('astar', seconds, 'cost %d, %d expanded, %d nodes held' %
+             (problem.getCostOfActions(actions), problem._expanded, stats.peakFrontier + stats.peakClosed))
+    searches = [('idastar', search.iterativeDeepeningAStarSearch, {}),
+                ('idastar without table', search.iterativeDeepeningAStarSearch, {'maxTableSize': 0}),
+                ('smastar maxNodes=10000', search.memoryBoundedAStarSearch, {'maxNodes': 10000}),
+                ('smastar maxNodes=1000', search.memoryBoundedAStarSearch, {'maxNodes': 1000})]
+    for name, searchFunction, keyArgs in searches:
+        problem = searchAgents.FoodSearchProblem(gameState)
+        actions, seconds = timeCall(searchFunction, problem, heuristic, **keyArgs)
+        printRow(name, seconds, 'cost %d, %d expanded' % (problem.getCostOfActions(actions), problem._expanded))
+
+def benchmarkHashDistributed(layoutName='trickySearch', workerCounts=(1, 2, 4, 8)):
+    """
+    A* against HDA* with several worker counts on CompactFoodSearchProblem.
+    Expansions above those of A* are the search overhead of workers which
+    do not wait for each other; the speedup needs as many free cores.
+    """
+    print 'Hash-distributed A* on %s (foodHeuristic, %d CPUs)' % (layoutName, multiprocessing.cpu_count())
+    gameState = loadGameState(layoutName)
+    heuristic = searchAgents.foodHeuristic
+    problem = searchAgents.CompactFoodSearchProblem(gameState)
+    actions, baseSeconds = timeCall(search.aStarSearch, problem, heuristic)
+    printRow('astar', baseSeconds, 'cost %d, %d expanded' % (problem.getCostOfActions(actions), problem._expanded))
+    for workers in workerCounts:
+        problem = searchAgents.CompactFoodSearchProblem(gameState)
+        actions, seconds = timeCall(search.hashDistributedAStarSearch, problem, heuristic, workers)
+        printRow('hdastar workers=%d' % workers, seconds, 'cost %d, %d expanded, speedup %.2f' %
+                 (problem.getCostOfActions(actions), problem._expanded, baseSeconds / seconds))
+
+def benchmarkPatternDatabases(puzzles=2):
+    "A* on random eight puzzles without a heuristic and with the additive pattern databases."
+    print 'Additive pattern databases on random eight puzzles'
+    cacheDirectory = tempfile.mkdtemp()
+    try:
+        databases, seconds = timeCall(patternDatabases.AdditivePatternDatabases, 3,
+                                      patternDatabases.DEFAULT_PATTERNS[3], cacheDirectory)
+        printRow('build', seconds)
+        databases, seconds = timeCall(patternDatabases.AdditivePatternDatabases, 3,
+                                      patternDatabases.DEFAULT_PATTERNS[3], cacheDirectory)
+        printRow('load from cache', seconds)
+    finally:
+        shutil.rmtree(cacheDirectory)
+
+    import random
+    random.seed(0)
+    for i in range(puzzles):
+        puzzle = eightpuzzle.createRandomEightPuzzle(100)
+        print 'Eight puzzle %d' % i
+        for name, heuristic in [('astar', search.nullHeuristic),
+                                ('astar additivePDBHeuristic', eightpuzzle.additivePDBHeuristic)]:
+            problem = eightpuzzle.CountingEightPuzzleSearchProblem(puzzle)
+            actions, seconds = timeCall(search.aStarSearch, problem, heuristic)
+            printRow(name, seconds, '%d moves, %d expanded' % (len(actions), problem._expanded))
+
+def benchmarkPuzzleStates():
+    "BFS on a random eight puzzle with list-based and packed integer states."
+    print 'Eight puzzle state representations (BFS)'
+    import random
+    random.seed(0)
+    puzzle = eightpuzzle.createRandomEightPuzzle(200)
+    compactPuzzle = eightpuzzle.CompactEightPuzzleState.fromPuzzle(puzzle)
+    for name, state in [('EightPuzzleState', puzzle), ('CompactEightPuzzleState', compactPuzzle)]:
+        problem = eightpuzzle.CountingEightPuzzleSearchProblem(state)
+        actions, seconds = timeCall(search.breadthFirstSearch, problem)
+        printRow(name, seconds, '%d moves, %d expanded, %d bytes per state' %
+                 (len(actions), problem._expanded, approximateSize(state)))
+
+class SearchingClosestDotAgent(searchAgents.ClosestDotSearchAgent):
+    "Finds every segment with a fresh breadth first search, as before the distance field."
+
+    def findPathToClosestDot(self, gameState):
+        return self.searchPathToClosestDot(gameState)
+
+def benchmarkClosestDot(layoutNames=('mediumSearch', 'bigSearch')):
+    """
+    ClosestDotSearchAgent walking down the repaired food distance field
+    against a breadth first search for every segment.
+    """
+    print 'Closest dot agent: distance field against one search per dot'
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for name, agentType in [('field', searchAgents.ClosestDotSearchAgent), ('bfs', SearchingClosestDotAgent)]:
+            agent = agentType()
+            nothing, seconds = timeCall(agent.registerInitialState, gameState)
+            findTimes = [times[0] for times in agent.segmentTimes]
+            repairTimes = [times[1] for times in agent.segmentTimes]
+            printRow('%s %s' % (layoutName, name), seconds, 'cost %d, %d segments, find %.3f ms, repair %.3f ms' %
+                     (len(agent.actions), len(findTimes), 1000 * sum(findTimes) / len(findTimes),
+                      1000 * sum(repairTimes) / len(repairTimes)))
+
+def benchmarkDistanceTable(puzzles=20):
+    """
+    The complete eight puzzle distance table: building and loading it,
+    solving by greedy descent against A* with the table as a perfect
+    heuristic and with the pattern databases, and checking the pattern
+    databases against it.
+    """
+    print 'Eight puzzle distance table'
+    cacheDirectory = tempfile.mkdtemp()
+    try:
+        distances, seconds = timeCall(eightpuzzle.EightPuzzleDistances, cacheDirectory)
+        printRow('build', seconds)
+        distances, seconds = timeCall(eightpuzzle.EightPuzzleDistances, cacheDirectory)
+        printRow('load from cache', seconds)
+    finally:
+        shutil.rmtree(cacheDirectory)
+
+    import random
+    random.seed(0)
+    states = [eightpuzzle.CompactEightPuzzleState.fromPuzzle(eightpuzzle.createRandomEightPuzzle(200))
+              for i in range(puzzles)]
+    eightpuzzle.getEightPuzzleDistances()
+    searches = [('greedy descent', eightpuzzle.greedyDescentSearch, {}),
+                ('astar perfectHeuristic', search.aStarSearch, {'heuristic': eightpuzzle.perfectHeuristic}),
+                ('astar additivePDBHeuristic', search.aStarSearch, {'heuristic': eightpuzzle.additivePDBHeuristic})]
+    for name, searchFunction, keyArgs in searches:
+        seconds = 0
+        expanded = 0
+        moves = 0
+        for state in states:
+            problem = eightpuzzle.CountingEightPuzzleSearchProblem(state)
+            actions, elapsed = timeCall(searchFunction, problem, **keyArgs)
+            seconds += elapsed
+            expanded += problem._expanded
+            moves += len(actions)
+        printRow(name, seconds, '%d puzzles, %d moves, %d expanded' % (len(states), moves, expanded))
+
+    overestimates, meanRatio = eightpuzzle.checkHeuristic(eightpuzzle.additivePDBHeuristic, states)
+    print 'additivePDBHeuristic: %d overestimates, %.3f of the true distance on average' % (len(overestimates), meanRatio)
+
+BENCHMARKS = {
+    'adjacency': benchmarkAdjacency,
+    'backtrack': benchmarkBacktrack,
+    'bidirectional': benchmarkBidirectional,
+    'buckets': benchmarkBuckets,
+    'closestdot': benchmarkClosestDot,
+    'distancetable': benchmarkDistanceTable,
+    'external': benchmarkExternal,
+    'foodmst': benchmarkFoodMST,
+    'foodstates': benchmarkFoodStates,
+    'frontiers': benchmarkFrontiers,
+    'grids': benchmarkGrids,
+    'hashdistributed': benchmarkHashDistributed,
+    'indexed': benchmarkIndexed,
+    'lazy': benchmarkLazy,
+    'mazedistances': benchmarkMazeDistances,
+    'memorybounded': benchmarkMemoryBounded,
+    'patterndb': benchmarkPatternDatabases,
+    'puzzlestates': benchmarkPuzzleStates,
+    'stats': benchmarkStats,
+    'successorcache': benchmarkSuccessorCache,
+    'waypoints': benchmarkWaypoints,
+}
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description = 'Run headless search benchmarks')
+    parser.add_option('-b', '--benchmark', dest = 'benchmarks', action = 'append', default = [],
+                      help = 'Run only the given benchmark (%s). May be repeated.' % ', '.join(sorted(BENCHMARKS)))
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    for name in options.benchmarks:
+        if name not in BENCHMARKS:
+            raise Exception('Unknown benchmark: ' + name)
+    return options
+
+if __name__ == '__main__':
+    import sys
+    options = readCommand(sys.argv[1:])
+    for name in options.benchmarks or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
+        print
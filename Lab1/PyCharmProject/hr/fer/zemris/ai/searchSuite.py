@@ -0,0 +1,317 @@
+# searchSuite.py
+# --------------
+# A reproducible, headless sweep of the search algorithms over every layout
+# and search problem, compared against a stored baseline.
+#
+# Examples:
+#   python searchSuite.py                       (run and compare to the baseline)
+#   python searchSuite.py -o results            (also write results.csv and results.json)
+#   python searchSuite.py -l bigMaze -a astar   (only some layouts and algorithms)
+#   python searchSuite.py --updateBaseline      (store the results as the new baseline)
+#   python searchSuite.py --checkRuntimes       (also fail on slower cases, on the baseline's machine)
+#
+# Every case runs with visualize=False and a budget of expanded nodes and
+# seconds, so the sweep always terminates.  Path costs, expansions and peak
+# frontier sizes are deterministic and must not get worse than the baseline.
+# Runtimes depend on the machine, so cases slower than the tolerance are only
+# reported unless --checkRuntimes is given.  The exit status is 1 if any case
+# regressed.
+
+
+import csv
+import json
+import optparse
+import os
+import sys
+import time
+
+import search
+import searchAgents
+from searchBenchmarks import loadGameState, timeCall
+
+LAYOUT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layouts')
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'searchSuiteBaseline.json')
+
+ALGORITHMS = ['dfs', 'bfs', 'ucs', 'astar']
+
+# The heuristics astar is run with for each problem type
+HEURISTICS = {
+    'PositionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic'],
+    'CornersProblem': ['nullHeuristic', 'cornersHeuristic'],
+    'FoodSearchProblem': ['nullHeuristic', 'foodHeuristic', 'foodMazeHeuristic'],
+}
+
+FIELDS = ['layout', 'problem', 'algorithm', 'heuristic', 'status', 'cost',
+          'expanded', 'runtime', 'peakFrontier', 'peakClosed', 'peakMemory']
+
+SOLVED, FAILED, OVER_BUDGET = 'solved', 'failed', 'budget'
+
+class BudgetExceeded(Exception):
+    pass
+
+class BudgetedProblem:
+    """
+    Wraps a search problem and raises BudgetExceeded once more than
+    maxExpanded states have been expanded or maxSeconds have passed.  Every
+    other attribute is read from the wrapped problem, so heuristics see the
+    problem they expect.
+    """
+
+    def __init__(self, problem, maxExpanded, maxSeconds):
+        self.problem = problem
+        self.maxExpanded = maxExpanded
+        self.deadline = time.time() + maxSeconds
+        self.expanded = 0
+
+    def getSuccessors(self, state):
+        self.expanded += 1
+        if self.expanded > self.maxExpanded or time.time() > self.deadline:
+            raise BudgetExceeded()
+        return self.problem.getSuccessors(state)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def positionProblem(gameState):
+    "A PositionSearchProblem towards the only food of the layout, or None."
+    food = gameState.getFood().asList()
+    if len(food) != 1:
+        return None
+    return searchAgents.PositionSearchProblem(gameState, goal=food[0], warn=False, visualize=False)
+
+def cornersProblem(gameState):
+    "A CornersProblem if all four corners of the layout hold food, or None."
+    walls = gameState.getWalls()
+    top, right = walls.height - 2, walls.width - 2
+    for corner in [(1, 1), (1, top), (right, 1), (right, top)]:
+        if not gameState.hasFood(*corner):
+            return None
+    return searchAgents.CornersProblem(gameState)
+
+def foodProblem(gameState):
+    return searchAgents.FoodSearchProblem(gameState)
+
+PROBLEMS = [
+    ('PositionSearchProblem', positionProblem),
+    ('CornersProblem', cornersProblem),
+    ('FoodSearchProblem', foodProblem),
+]
+
+def getLayoutNames():
+    return sorted([name[:-4] for name in os.listdir(LAYOUT_DIRECTORY) if name.endswith('.lay')])
+
+def getCases(layoutNames, algorithms, problemNames):
+    "Returns (layoutName, problemName, problemFactory, algorithm, heuristic) for every case to run."
+    cases = []
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for problemName, problemFactory in PROBLEMS:
+            if problemName not in problemNames or problemFactory(gameState) == None:
+                continue
+            for algorithm in algorithms:
+                heuristics = [None]
+                if algorithm == 'astar':
+                    heuristics = HEURISTICS[problemName]
+                for heuristic in heuristics:
+                    cases.append((layoutName, problemName, problemFactory, algorithm, heuristic))
+    return cases
+
+def getHeuristic(name):
+    if hasattr(searchAgents, name):
+        return getattr(searchAgents, name)
+    return getattr(search, name)
+
+def runCase(layoutName, problemName, problemFactory, algorithm, heuristic, maxExpanded, maxSeconds, repeats):
+    """
+    Runs one case repeats times and returns its result row.  The runtime is
+    the fastest of the repeats; everything else is identical between them.
+    """
+    gameState = loadGameState(layoutName)
+    searchFunction = getattr(search, algorithm)
+    keyArgs = {}
+    if heuristic != None:
+        keyArgs['heuristic'] = getHeuristic(heuristic)
+    row = {'layout': layoutName, 'problem': problemName, 'algorithm': algorithm,
+           'heuristic': heuristic or '', 'runtime': None}
+    for i in range(repeats):
+        problem = BudgetedProblem(problemFactory(gameState), maxExpanded, maxSeconds)
+        stats = search.SearchStats()
+        try:
+            actions, seconds = timeCall(searchFunction, problem, stats=stats, **keyArgs)
+        except BudgetExceeded:
+            stats.stop()
+            row.update({'status': OVER_BUDGET, 'cost': None, 'expanded': problem.expanded, 'runtime': None})
+            break
+        if row['runtime'] == None or seconds < row['runtime']:
+            row['runtime'] = seconds
+        # An empty plan is only a solution if the start state is a goal
+        if actions or problem.isGoalState(problem.getStartState()):
+            row.update({'status': SOLVED, 'cost': problem.getCostOfActions(actions)})
+        else:
+            row.update({'status': FAILED, 'cost': None})
+        row['expanded'] = problem.expanded
+    row['peakFrontier'] = stats.peakFrontier
+    row['peakClosed'] = stats.peakClosed
+    # Every frontier entry is a search node, and so is (at least) every
+    # expanded one, since the nodes on the frontier point back at them
+    row['peakMemory'] = (stats.peakFrontier + stats.peakClosed) * stats.bytesPerNode
+    return row
+
+def caseKey(row):
+    return '%s/%s/%s/%s' % (row['layout'], row['problem'], row['algorithm'], row['heuristic'])
+
+def compareToBaseline(rows, baseline, timeTolerance, minTimeDelta, checkRuntimes=False):
+    """
+    Returns (regressions, improvements, slowdowns) as lists of messages.
+    Statuses, costs, expansions and peak frontier sizes must not get worse.
+    Runtimes may grow by the fraction timeTolerance, or by minTimeDelta
+    seconds on very fast cases; slower cases are regressions only with
+    checkRuntimes, and slowdowns otherwise.
+    """
+    regressions, improvements, slowdowns = [], [], []
+    for row in rows:
+        key = caseKey(row)
+        if key not in baseline:
+            improvements.append('%s: new case' % key)
+            continue
+        old = baseline[key]
+        if old['status'] != row['status']:
+            message = '%s: status %s -> %s' % (key, old['status'], row['status'])
+            if old['status'] == SOLVED:
+                regressions.append(message)
+            else:
+                improvements.append(message)
+            continue
+        if row['status'] != SOLVED:
+            continue
+        if row['cost'] > old['cost']:
+            regressions.append('%s: cost %s -> %s' % (key, old['cost'], row['cost']))
+        elif row['cost'] < old['cost']:
+            improvements.append('%s: cost %s -> %s' % (key, old['cost'], row['cost']))
+        if row['expanded'] > old['expanded']:
+            regressions.append('%s: expanded %d -> %d' % (key, old['expanded'], row['expanded']))
+        elif row['expanded'] < old['expanded']:
+            improvements.append('%s: expanded %d -> %d' % (key, old['expanded'], row['expanded']))
+        if row['peakFrontier'] > old['peakFrontier']:
+            regressions.append('%s: peak frontier %d -> %d' % (key, old['peakFrontier'], row['peakFrontier']))
+        limit = max(old['runtime'] * (1 + timeTolerance), old['runtime'] + minTimeDelta)
+        if row['runtime'] > limit:
+            message = '%s: runtime %.4f s -> %.4f s' % (key, old['runtime'], row['runtime'])
+            if checkRuntimes:
+                regressions.append(message)
+            else:
+                slowdowns.append(message)
+    return regressions, improvements, slowdowns
+
+def writeCSV(rows, fileName):
+    f = open(fileName, 'wb')
+    try:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writerow(dict([(field, field) for field in FIELDS]))
+        for row in rows:
+            writer.writerow(row)
+    finally:
+        f.close()
+
+def writeJSON(rows, fileName):
+    f = open(fileName, 'w')
+    try:
+        json.dump(dict([(caseKey(row), row) for row in rows]), f, sort_keys=True, indent=1)
+    finally:
+        f.close()
+
+def readJSON(fileName):
+    f = open(fileName)
+    try:
+        return json.load(f)
+    finally:
+        f.close()
+
+def formatRow(row):
+    if row['status'] == SOLVED:
+        result = 'cost %4d  expanded %7d  %8.4f s  %9d B' % (row['cost'], row['expanded'], row['runtime'], row['peakMemory'])
+    else:
+        result = row['status']
+    return '%-60s %s' % (caseKey(row), result)
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description = 'Run every search algorithm on every layout and compare to a baseline')
+    parser.add_option('-l', '--layout', dest = 'layouts', action = 'append', default = [],
+                      help = 'Run only the given layout. May be repeated.')
+    parser.add_option('-a', '--algorithm', dest = 'algorithms', action = 'append', default = [],
+                      help = 'Run only the given algorithm (%s). May be repeated.' % ', '.join(ALGORITHMS))
+    parser.add_option('-p', '--problem', dest = 'problems', action = 'append', default = [],
+                      help = 'Run only the given problem type. May be repeated.')
+    parser.add_option('-o', '--output', dest = 'output', default = None,
+                      help = 'Write the results to OUTPUT.csv and OUTPUT.json')
+    parser.add_option('-b', '--baseline', dest = 'baseline', default = BASELINE_FILE,
+                      help = 'The baseline to compare to (default %default)')
+    parser.add_option('--updateBaseline', dest = 'updateBaseline', action = 'store_true', default = False,
+                      help = 'Store the results as the baseline instead of comparing to it')
+    parser.add_option('-m', '--maxExpanded', dest = 'maxExpanded', type = 'int', default = 50000,
+                      help = 'Stop a case after this many expanded nodes (default %default)')
+    parser.add_option('-s', '--maxSeconds', dest = 'maxSeconds', type = 'float', default = 10.0,
+                      help = 'Stop a case after this many seconds (default %default)')
+    parser.add_option('-r', '--repeats', dest = 'repeats', type = 'int', default = 1,
+                      help = 'Keep the fastest of this many runs of each case (default %default)')
+    parser.add_option('--timeTolerance', dest = 'timeTolerance', type = 'float', default = 1.0,
+                      help = 'Allowed relative runtime growth (default %default)')
+    parser.add_option('--minTimeDelta', dest = 'minTimeDelta', type = 'float', default = 0.05,
+                      help = 'Allowed absolute runtime growth in seconds (default %default)')
+    parser.add_option('--checkRuntimes', dest = 'checkRuntimes', action = 'store_true', default = False,
+                      help = 'Count runtimes beyond the tolerance as regressions, not only report them')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    for name in options.algorithms:
+        if name not in ALGORITHMS:
+            raise Exception('Unknown algorithm: ' + name)
+    for name in options.problems:
+        if name not in HEURISTICS:
+            raise Exception('Unknown problem type: ' + name)
+    return options
+
+def runSuite(options):
+    layoutNames = options.layouts or getLayoutNames()
+    algorithms = options.algorithms or ALGORITHMS
+    problemNames = options.problems or [name for name, problemFactory in PROBLEMS]
+    rows = []
+    for case in getCases(layoutNames, algorithms, problemNames):
+        row = runCase(*(case + (options.maxExpanded, options.maxSeconds, options.repeats)))
+        print formatRow(row)
+        rows.append(row)
+    if options.output != None:
+        writeCSV(rows, options.output + '.csv')
+        writeJSON(rows, options.output + '.json')
+
+    if options.updateBaseline:
+        baseline = {}
+        if os.path.exists(options.baseline):
+            baseline = readJSON(options.baseline)
+        baseline.update(dict([(caseKey(row), row) for row in rows]))
+        writeJSON(baseline.values(), options.baseline)
+        print 'Baseline written to %s' % options.baseline
+        return 0
+    if not os.path.exists(options.baseline):
+        print 'No baseline found at %s; run with --updateBaseline to create one' % options.baseline
+        return 0
+
+    regressions, improvements, slowdowns = compareToBaseline(rows, readJSON(options.baseline),
+                                                             options.timeTolerance, options.minTimeDelta,
+                                                             options.checkRuntimes)
+    print
+    for message in improvements:
+        print 'Improved:   ' + message
+    for message in slowdowns:
+        print 'Slower:     ' + message
+    for message in regressions:
+        print 'REGRESSION: ' + message
+    if regressions:
+        print '*** %d of %d cases regressed against %s' % (len(regressions), len(rows), options.baseline)
+        return 1
+    print '%d cases match the baseline' % len(rows)
+    return 0
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    sys.exit(runSuite(options))
@@ -16,6 +16,7 @@ import sys
 import inspect
 import heapq, random
 import cStringIO
+from collections import deque, OrderedDict
 
 
 class FixedRandom:
@@ -136,20 +137,24 @@ class Stack:
         return len(self.list) == 0
 
 class Queue:
-    "A container with a first-in-first-out (FIFO) queuing policy."
+    """
+    A container with a first-in-first-out (FIFO) queuing policy.
+
+    Backed by a deque, so both push and pop take constant time.
+    """
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
@@ -183,6 +188,14 @@ class PriorityQueue:
         #  (_, item) = heapq.heappop(self.heap)
         return item
 
+    def peek(self):
+        "Returns the lowest-priority item without removing it"
+        return self.heap[0][2]
+
+    def getMinPriority(self):
+        "Returns the priority of the lowest-priority item"
+        return self.heap[0][0]
+
     def isEmpty(self):
         return len(self.heap) == 0
 
@@ -214,6 +227,343 @@ class PriorityQueueWithFunction(PriorityQueue):
     #                self.heap.remove(x)
     #y                return
 
+class BucketPriorityQueueWithFunction:
+    """
+    A drop-in replacement for PriorityQueueWithFunction which is faster when
+    the priorities are small non-negative integers, as they are for path
+    costs built from unit (or other small integer) step costs.
+
+    Items are kept in one bucket per priority value and a cursor points at
+    the lowest non-empty bucket, so push and pop do not need to compare
+    items.  Within a bucket items are popped in insertion order, unless a
+    tieBreakFunction is given; then the item with the lowest
+    tieBreakFunction(item) is popped first (for example lambda node:
+    -node.cost prefers deeper nodes on A* plateaus).
+
+    If a priority is not integral, or would need more than maxSpan buckets,
+    all items are moved into a binary heap and the queue behaves exactly like
+    PriorityQueueWithFunction from then on.
+    """
+    def __init__(self, priorityFunction, tieBreakFunction=None, maxSpan=4096):
+        "priorityFunction (item) -> priority"
+        self.priorityFunction = priorityFunction
+        self.tieBreakFunction = tieBreakFunction
+        self.maxSpan = maxSpan
+        self.buckets = []   # buckets[i] holds the items with priority base + i
+        self.base = None
+        self.cursor = 0
+        self.size = 0
+        self.count = 0
+        self.heap = None    # set once the queue falls back to a heap
+
+    def push(self, item):
+        "Adds an item to the queue with priority from the priority function"
+        priority = self.priorityFunction(item)
+        if self.tieBreakFunction == None:
+            entry = (0, self.count, item)
+        else:
+            entry = (self.tieBreakFunction(item), self.count, item)
+        self.count += 1
+        self.size += 1
+
+        if self.heap == None and not self._reserveBucket(priority):
+            self._moveToHeap()
+        if self.heap != None:
+            heapq.heappush(self.heap, (priority,) + entry)
+            return
+
+        index = int(priority) - self.base
+        if self.tieBreakFunction == None:
+            self.buckets[index].append(entry)
+        else:
+            heapq.heappush(self.buckets[index], entry)
+        if index < self.cursor:
+            self.cursor = index
+
+    def pop(self):
+        "Removes and returns the item with the lowest priority."
+        self.size -= 1
+        if self.heap != None:
+            return heapq.heappop(self.heap)[3]
+        buckets = self.buckets
+        while not buckets[self.cursor]:
+            self.cursor += 1
+        if self.tieBreakFunction == None:
+            return buckets[self.cursor].popleft()[2]
+        return heapq.heappop(buckets[self.cursor])[2]
+
+    def isEmpty(self):
+        return self.size == 0
+
+    def _newBucket(self):
+        if self.tieBreakFunction == None:
+            return deque()
+        return []
+
+    def _reserveBucket(self, priority):
+        """
+        Makes sure a bucket exists for the priority.  Returns False if the
+        priority cannot be kept in a bucket.
+        """
+        if priority < 0 or int(priority) != priority:
+            return False
+        priority = int(priority)
+        if self.base == None:
+            self.base = priority
+        if priority < self.base:
+            missing = self.base - priority
+            if len(self.buckets) + missing > self.maxSpan:
+                return False
+            self.buckets[:0] = [self._newBucket() for i in range(missing)]
+            self.cursor += missing
+            self.base = priority
+        index = priority - self.base
+        if index >= len(self.buckets):
+            if index >= self.maxSpan:
+                return False
+            self.buckets.extend([self._newBucket() for i in range(index + 1 - len(self.buckets))])
+        return True
+
+    def _moveToHeap(self):
+        heap = []
+        for index in range(len(self.buckets)):
+            for entry in self.buckets[index]:
+                heap.append((self.base + index,) + entry)
+        heapq.heapify(heap)
+        self.heap = heap
+        self.buckets = []
+
+class IndexedPriorityQueue:
+    """
+      A binary heap which holds at most one item per key (usually a search
+      state).  A map from keys to heap positions allows the priority of a
+      queued key to be lowered in place (decrease-key), so the heap never
+      grows beyond the number of distinct keys pushed into it.
+
+      Items with equal priority are popped in insertion order, the same as
+      in PriorityQueue.
+    """
+    def __init__(self):
+        self.heap = []
+        self.index = {}
+        self.count = 0
+
+    def push(self, key, item, priority):
+        """
+          Queues the item under the key.  If the key is already queued with
+          a higher priority its item and priority are replaced, otherwise
+          nothing changes.  Returns True if the queue was changed.
+        """
+        if key in self.index:
+            position = self.index[key]
+            entry = self.heap[position]
+            if entry[0] <= priority:
+                return False
+            entry[0], entry[1], entry[3] = priority, self.count, item
+            self.count += 1
+            self._siftUp(position)
+            return True
+        entry = [priority, self.count, key, item]
+        self.count += 1
+        self.heap.append(entry)
+        self.index[key] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+        return True
+
+    def pop(self):
+        "Removes and returns the item with the lowest priority."
+        return self.popEntry()[1]
+
+    def popEntry(self):
+        "Removes the lowest-priority entry and returns its (priority, item)."
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            entry = heap[0]
+            heap[0] = last
+            self.index[last[2]] = 0
+            self._siftDown(0)
+        else:
+            entry = last
+        del self.index[entry[2]]
+        return entry[0], entry[3]
+
+    def getMinPriority(self):
+        "Returns the lowest priority in the queue."
+        return self.heap[0][0]
+
+    def getPriority(self, key):
+        "Returns the priority the key is queued with."
+        return self.heap[self.index[key]][0]
+
+    def getItem(self, key):
+        "Returns the item queued under the key."
+        return self.heap[self.index[key]][3]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _siftUp(self, position):
+        heap, index = self.heap, self.index
+        entry = heap[position]
+        while position > 0:
+            parentPosition = (position - 1) >> 1
+            parent = heap[parentPosition]
+            if entry < parent:
+                heap[position] = parent
+                index[parent[2]] = position
+                position = parentPosition
+            else:
+                break
+        heap[position] = entry
+        index[entry[2]] = position
+
+    def _siftDown(self, position):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[position]
+        child = 2 * position + 1
+        while child < size:
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] < entry:
+                heap[position] = heap[child]
+                index[heap[position][2]] = position
+                position = child
+                child = 2 * position + 1
+            else:
+                break
+        heap[position] = entry
+        index[entry[2]] = position
+
+class DoubleEndedPriorityQueue:
+    """
+      Holds at most one item per key and gives access to both the item with
+      the lowest and the one with the highest priority.  Removed and
+      replaced entries are only marked, and dropped from the two heaps once
+      they reach the top of one of them.
+
+      Among items of equal priority the oldest is the lowest and the newest
+      is the highest.
+    """
+    def __init__(self):
+        self.minHeap = []
+        self.maxHeap = []
+        self.entries = {}
+        self.count = 0
+
+    def push(self, key, item, priority):
+        "Queues the item under the key, replacing any item already queued under it."
+        if key in self.entries:
+            self.entries[key][3] = False
+        entry = [key, item, priority, True]
+        self.entries[key] = entry
+        heapq.heappush(self.minHeap, (priority, self.count, entry))
+        heapq.heappush(self.maxHeap, (_ReversedPriority(priority), -self.count, entry))
+        self.count += 1
+
+    def remove(self, key):
+        "Removes the item queued under the key."
+        self.entries.pop(key)[3] = False
+
+    def peekMin(self):
+        "Returns the lowest-priority item without removing it."
+        return self._top(self.minHeap)[1]
+
+    def peekMax(self):
+        "Returns the highest-priority item without removing it."
+        return self._top(self.maxHeap)[1]
+
+    def getMinPriority(self):
+        return self._top(self.minHeap)[2]
+
+    def getMaxPriority(self):
+        return self._top(self.maxHeap)[2]
+
+    def popMin(self):
+        entry = self._top(self.minHeap)
+        self.remove(entry[0])
+        return entry[1]
+
+    def popMax(self):
+        entry = self._top(self.maxHeap)
+        self.remove(entry[0])
+        return entry[1]
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _top(self, heap):
+        while not heap[0][2][3]:
+            heapq.heappop(heap)
+        return heap[0][2]
+
+class _ReversedPriority:
+    "Wraps a priority so that it compares in the opposite order."
+    __slots__ = ('priority',)
+
+    def __init__(self, priority):
+        self.priority = priority
+
+    def __lt__(self, other):
+        return other.priority < self.priority
+
+    def __eq__(self, other):
+        return self.priority == other.priority
+
+class LRUCache:
+    """
+      A dictionary which holds at most maxSize items.  Storing an item
+      beyond that evicts the one least recently stored or fetched.  hits
+      and misses count the lookups made with get.
+    """
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        "Returns the item stored under the key, marking it as recently used."
+        items = self.items
+        if key not in items:
+            self.misses += 1
+            return default
+        self.hits += 1
+        value = items.pop(key)
+        items[key] = value
+        return value
+
+    def peek(self, key, default=None):
+        "Returns the item stored under the key without counting or reordering it."
+        return self.items.get(key, default)
+
+    def put(self, key, value):
+        items = self.items
+        if key in items:
+            del items[key]
+        elif len(items) >= self.maxSize:
+            items.popitem(last=False)
+        items[key] = value
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )
@@ -1,5 +1,4 @@
 import util
-import copy
 
 from util import Queue
 from game import Directions
@@ -42,11 +41,12 @@ class SearchNode:
         Reconstruct a path to the initial state from the current node.
         """
         moves = []
-        
-        node = copy.deepcopy(self)
+
+        node = self
         while node.parent is not None: 
-            moves.insert(0, node.transition)
+            moves.append(node.transition)
             node = node.parent
+        moves.reverse()
 
         return moves
 
@@ -46,10 +46,11 @@ def closestFood(pos, food, walls):
     closestFood -- this is similar to the function that we have
     worked on in the search project; here its all in one place
     """
-    fringe = [(pos[0], pos[1], 0)]
+    fringe = util.Queue()
+    fringe.push((pos[0], pos[1], 0))
     expanded = set()
-    while fringe:
-        pos_x, pos_y, dist = fringe.pop(0)
+    while not fringe.isEmpty():
+        pos_x, pos_y, dist = fringe.pop()
         if (pos_x, pos_y) in expanded:
             continue
         expanded.add((pos_x, pos_y))
@@ -59,7 +60,7 @@ def closestFood(pos, food, walls):
         # otherwise spread out from the location to its neighbours
         nbrs = Actions.getLegalNeighbors((pos_x, pos_y), walls)
         for nbr_x, nbr_y in nbrs:
-            fringe.append((nbr_x, nbr_y, dist+1))
+            fringe.push((nbr_x, nbr_y, dist+1))
     # no food found
     return None
 